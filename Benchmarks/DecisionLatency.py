@@ -0,0 +1,89 @@
+"""
+Decision-to-send latency of the client's decision wait.
+
+A producer thread pushes Hit/Stand commands at random moments, the way the
+terminal listener and the web endpoints do. The consumer waits for a
+decision and forwards it over a socket pair; the benchmark measures the time
+from the command being queued to the bytes being sent, plus the CPU the
+waiting consumer burns.
+
+Compares the old loop (check the web queue, check the terminal queue,
+sleep 100 ms) with the single blocking queue Client.ask_player_decision uses.
+
+    python DecisionLatency.py --decisions 100
+"""
+import argparse
+import queue
+import random
+import socket
+import threading
+import time
+
+
+def wait_polling(web_commands, input_queue):
+    while True:
+        if not web_commands.empty():
+            return web_commands.get()
+        if not input_queue.empty():
+            source, cmd = input_queue.get()
+            if cmd.lower() in ["hit", "stand"]:
+                return cmd.capitalize()
+        time.sleep(0.1)
+
+
+def wait_blocking(web_commands, input_queue):
+    while True:
+        source, cmd = input_queue.get()
+        if cmd.lower() in ["hit", "stand"]:
+            return cmd.capitalize()
+
+
+def run(wait, decisions, seed):
+    rng = random.Random(seed)
+    web_commands = queue.Queue()
+    input_queue = queue.Queue()
+    sent_at = []
+    queued_at = []
+    client_sock, server_sock = socket.socketpair()
+
+    def produce():
+        for i in range(decisions):
+            time.sleep(rng.uniform(0.0, 0.2))
+            queued_at.append(time.perf_counter())
+            # half the decisions come from the browser, half from the terminal
+            if i % 2 and wait is wait_polling:
+                web_commands.put("Hit")
+            else:
+                input_queue.put(("WEB" if i % 2 else "TERMINAL", "hit"))
+
+    producer = threading.Thread(target=produce)
+    cpu_start = time.process_time()
+    producer.start()
+    for _ in range(decisions):
+        client_sock.sendall(wait(web_commands, input_queue).encode())
+        sent_at.append(time.perf_counter())
+    producer.join()
+    cpu = time.process_time() - cpu_start
+
+    client_sock.close()
+    server_sock.close()
+
+    latencies = sorted(sent - queued for sent, queued in zip(sent_at, queued_at))
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "cpu_ms": cpu * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Client decision-to-send latency")
+    parser.add_argument("--decisions", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for label, wait in (("polling", wait_polling), ("blocking", wait_blocking)):
+        report = run(wait, args.decisions, args.seed)
+        print(f"{label:>8}: p50 {report['p50_ms']:.2f} ms | p99 {report['p99_ms']:.2f} ms | "
+              f"max {report['max_ms']:.2f} ms | waiting CPU {report['cpu_ms']:.1f} ms")
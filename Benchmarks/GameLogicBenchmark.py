@@ -0,0 +1,70 @@
+"""
+Memory and throughput of the GameLogic package.
+
+Measures the bytes held by one live game (deck plus both hands, after the
+initial deal) and how many rounds per second can be dealt and played out
+with the dealer rules, both with a fresh Game per round and with one Game
+reused across rounds.
+
+    python GameLogicBenchmark.py --rounds 200000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "Server"))
+
+from GameLogic.Game import Game
+
+
+def bytes_per_game(games):
+    # build one game first so module level state (e.g. interned cards) is not counted
+    Game().start()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    live = []
+    for _ in range(games):
+        game = Game()
+        game.start()
+        live.append(game)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return allocated / games
+
+
+def play_round(game):
+    game.start()
+    while game.player_hand.total() < 17:
+        game.player_hit()
+    if not game.player_hand.is_bust():
+        game.player_stand()
+    return game.result()
+
+
+def rounds_per_second(rounds, reuse):
+    game = Game()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if reuse:
+            game.reset()
+        else:
+            game = Game()
+        play_round(game)
+    return rounds / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GameLogic memory and deal throughput")
+    parser.add_argument("--rounds", type=int, default=200000)
+    parser.add_argument("--games", type=int, default=10000, help="live games kept for the memory measurement")
+    args = parser.parse_args()
+
+    print(f"memory per live game: {bytes_per_game(args.games):.0f} B")
+    print(f"new Game per round:   {rounds_per_second(args.rounds, reuse=False):.0f} rounds/s")
+    print(f"reused Game:          {rounds_per_second(args.rounds, reuse=True):.0f} rounds/s")
@@ -0,0 +1,169 @@
+"""
+Load test for the blackjack game server.
+
+Starts Server.py in the requested mode (or targets a server that is already
+running), plays many concurrent sessions against it and reports sessions per
+second and round latency percentiles.
+
+    python LoadTest.py --mode both --sessions 500 --concurrency 200 --rounds 3
+    python LoadTest.py --port 50123 --sessions 100
+"""
+import argparse
+import asyncio
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT_DIR, "Server")
+
+sys.path.insert(0, ROOT_DIR)
+
+from Protocol.Messages import MAGIC_COOKIE, MSG_TYPE_REQUEST, REQUEST_STRUCT, PAYLOAD_STRUCT
+
+
+def card_value(rank):
+    if rank == 1:
+        return 11
+    if rank >= 10:
+        return 10
+    return rank
+
+
+def hand_total(ranks):
+    total = sum(card_value(rank) for rank in ranks)
+    aces = ranks.count(1)
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def play_session(host, port, rounds, round_latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        name = struct.pack('32s', b"loadtest")
+        writer.write(REQUEST_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_REQUEST, rounds, name))
+        await writer.drain()
+
+        for _ in range(rounds):
+            round_start = time.perf_counter()
+            player_ranks = []
+            for i in range(3):
+                _, _, _, rank, _ = PAYLOAD_STRUCT.unpack(await reader.readexactly(PAYLOAD_STRUCT.size))
+                if i < 2:
+                    player_ranks.append(rank)
+
+            result = 0
+            while result == 0:
+                # dealer rule as the player policy: hit below 17
+                decision = "Hit" if hand_total(player_ranks) < 17 else "Stand"
+                writer.write(decision.encode())
+                await writer.drain()
+
+                if decision == "Hit":
+                    _, _, result, rank, _ = PAYLOAD_STRUCT.unpack(await reader.readexactly(PAYLOAD_STRUCT.size))
+                    player_ranks.append(rank)
+                else:
+                    while result == 0:
+                        _, _, result, _, _ = PAYLOAD_STRUCT.unpack(await reader.readexactly(PAYLOAD_STRUCT.size))
+
+            round_latencies.append(time.perf_counter() - round_start)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, sessions, concurrency, rounds):
+    limit = asyncio.Semaphore(concurrency)
+    round_latencies = []
+    failures = 0
+
+    async def one_session():
+        nonlocal failures
+        async with limit:
+            try:
+                await play_session(host, port, rounds, round_latencies)
+            except (OSError, asyncio.IncompleteReadError):
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": sessions - failures,
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "sessions_per_s": (sessions - failures) / elapsed,
+        "rounds_per_s": len(round_latencies) / elapsed,
+        "p50_round_ms": percentile(round_latencies, 50) * 1000,
+        "p99_round_ms": percentile(round_latencies, 99) * 1000,
+    }
+
+
+def start_server(mode, max_sessions, extra_args=()):
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "Server.py", "loadtest", "--mode", mode, "--max-sessions", str(max_sessions),
+         *extra_args],
+        cwd=SERVER_DIR,
+        stdout=subprocess.PIPE,
+        # the log goes to stderr from its own thread, it would interleave with the port line
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+
+    for line in proc.stdout:
+        if line.startswith("TCP listening on port"):
+            port = int(line.split()[4])
+            break
+    else:
+        raise RuntimeError(f"Server ({mode}) exited before listening")
+
+    # keep draining so the server never blocks on stdout
+    threading.Thread(target=proc.stdout.read, daemon=True).start()
+    return proc, port
+
+
+def print_report(label, report):
+    print(f"{label:>8}: {report['sessions']} sessions ({report['failures']} failed) in {report['elapsed_s']:.2f}s | "
+          f"{report['sessions_per_s']:.1f} sessions/s | {report['rounds_per_s']:.1f} rounds/s | "
+          f"p50 {report['p50_round_ms']:.1f} ms | p99 {report['p99_round_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blackjack server load test")
+    parser.add_argument("--mode", choices=["thread", "async", "both"], default="both")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target a running server instead of starting one")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200, help="sessions open at the same time")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--server-max-sessions", type=int,
+                        help="--max-sessions passed to the server (defaults to --concurrency)")
+    args = parser.parse_args()
+
+    if args.port:
+        print_report("server", asyncio.run(run_load(args.host, args.port, args.sessions, args.concurrency, args.rounds)))
+        sys.exit(0)
+
+    max_sessions = args.server_max_sessions or args.concurrency
+    modes = ["thread", "async"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        proc, port = start_server(mode, max_sessions)
+        try:
+            report = asyncio.run(run_load("127.0.0.1", port, args.sessions, args.concurrency, args.rounds))
+            print_report(mode, report)
+        finally:
+            proc.kill()
+            proc.wait()
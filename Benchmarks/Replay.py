@@ -0,0 +1,150 @@
+"""
+Replays a session capture against a server and checks it answers the same.
+
+Record real traffic with `Server.py NAME --capture traffic.cap`, then re-drive
+every recorded session (same request, same decisions, same think times and
+session start times) against a local server started with the capture's shoe
+seeds. Every payload byte must match the recording; the report gives the
+server's response latency distribution, so runs of different builds on the
+same traffic can be compared.
+
+    python Replay.py traffic.cap                   # 1x, recorded pacing
+    python Replay.py traffic.cap --speed 10        # 10x faster
+    python Replay.py traffic.cap --speed 0         # as fast as possible
+    python Replay.py traffic.cap --port 50123      # server already started with --replay-seeds
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "Server"))
+
+from Capture import read_capture, DECISION, PAYLOAD, REPLAY_PREFIX
+from LoadTest import start_server, percentile
+
+
+def replay_request(session):
+    """The recorded request with the session's name replaced by its replay name."""
+    request = session.request
+    name = struct.pack('32s', (REPLAY_PREFIX + str(session.session_id)).encode())
+    # every request type ends with the 32-byte client name
+    return request[:-32] + name
+
+
+async def replay_session(host, port, session, speed, clock_start, first_start, latencies, report):
+    if speed:
+        delay = (session.start - first_start) / 1_000_000 / speed - (time.perf_counter() - clock_start)
+        await asyncio.sleep(max(delay, 0))
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(replay_request(session))
+        sent_at = time.perf_counter()
+        last_time, last_received = session.start, sent_at
+
+        for kind, offset, data in session.events:
+            if kind == DECISION:
+                if speed:
+                    # keep the player's recorded think time, scaled
+                    think = (offset - last_time) / 1_000_000 / speed
+                    await asyncio.sleep(max(think - (time.perf_counter() - last_received), 0))
+                writer.write(data)
+                sent_at = time.perf_counter()
+
+            elif kind == PAYLOAD:
+                received = await reader.readexactly(len(data))
+                last_received = time.perf_counter()
+                if sent_at is not None:
+                    latencies.append(last_received - sent_at)
+                    sent_at = None
+                if received != data:
+                    report["mismatched"] += 1
+                    return
+
+            last_time = offset
+
+        if session.complete and await reader.read(1):
+            # the server sent more than was recorded
+            report["mismatched"] += 1
+            return
+        report["matched"] += 1
+
+    except (OSError, asyncio.IncompleteReadError):
+        report["failed"] += 1
+    finally:
+        writer.close()
+
+
+async def run_replay(host, port, sessions, speed, concurrency):
+    latencies = []
+    report = {"sessions": len(sessions), "matched": 0, "mismatched": 0, "failed": 0}
+    # at full speed the recorded start times are ignored, so cap the sessions in flight instead
+    limit = asyncio.Semaphore(concurrency if not speed else len(sessions) or 1)
+    first_start = min((session.start for session in sessions), default=0)
+
+    async def one_session(session):
+        async with limit:
+            await replay_session(host, port, session, speed, clock_start, first_start, latencies, report)
+
+    clock_start = time.perf_counter()
+    await asyncio.gather(*(one_session(session) for session in sessions))
+    report["elapsed_s"] = time.perf_counter() - clock_start
+    report["responses"] = len(latencies)
+    for pct in (50, 90, 99):
+        report[f"p{pct}_ms"] = percentile(latencies, pct) * 1000
+    report["max_ms"] = max(latencies, default=0) * 1000
+    return report
+
+
+def print_report(label, report):
+    print(f"{label:>8}: {report['matched']}/{report['sessions']} sessions matched "
+          f"({report['mismatched']} mismatched, {report['failed']} failed) in {report['elapsed_s']:.2f}s | "
+          f"{report['responses']} responses | p50 {report['p50_ms']:.2f} ms | p90 {report['p90_ms']:.2f} ms | "
+          f"p99 {report['p99_ms']:.2f} ms | max {report['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a captured session log against a blackjack server")
+    parser.add_argument("capture", help="file written by Server.py --capture")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="time scale of the recorded pacing, 0 replays as fast as possible")
+    parser.add_argument("--mode", choices=["thread", "async", "both"], default="both",
+                        help="server mode(s) to start, ignored with --port")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target a server already started with --replay-seeds")
+    parser.add_argument("--concurrency", type=int, default=16, help="sessions in flight at --speed 0")
+    parser.add_argument("--server-max-sessions", type=int, default=64, help="--max-sessions passed to the server")
+    parser.add_argument("--json", metavar="PATH", help="also write the reports to PATH")
+    args = parser.parse_args()
+
+    decks, penetration, captured = read_capture(args.capture)
+    sessions = sorted(captured.values(), key=lambda session: session.start)
+    print(f"{args.capture}: {len(sessions)} sessions, {decks} decks, penetration {penetration}")
+
+    reports = {}
+    if args.port:
+        reports["server"] = asyncio.run(run_replay(args.host, args.port, sessions, args.speed, args.concurrency))
+    else:
+        modes = ["thread", "async"] if args.mode == "both" else [args.mode]
+        for mode in modes:
+            proc, port = start_server(mode, args.server_max_sessions, ["--replay-seeds", args.capture])
+            try:
+                reports[mode] = asyncio.run(run_replay("127.0.0.1", port, sessions, args.speed, args.concurrency))
+            finally:
+                proc.kill()
+                proc.wait()
+
+    for label, report in reports.items():
+        print_report(label, report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"capture": args.capture, "speed": args.speed, "reports": reports}, f, indent=2)
+
+    sys.exit(0 if all(report["matched"] == report["sessions"] for report in reports.values()) else 1)
@@ -0,0 +1,105 @@
+"""
+Microbenchmark of the server's payload send path.
+
+Plays the same rounds twice over a local socket pair: once with one
+struct.pack + sendall per card (the old send_card), once with every card of
+a server turn packed into one FrameWriter buffer (TextProtocol.pack). Reports
+writes, payload bytes and estimated bytes on the wire per round.
+
+    python SendBenchmark.py --rounds 20000
+"""
+import argparse
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "Server"))
+
+from Protocol.Framing import FrameWriter
+from Protocol.Messages import MAGIC_COOKIE, MSG_TYPE_PAYLOAD, PAYLOAD_STRUCT
+from Session import Session
+
+# IPv4 + TCP header with the timestamp option, assuming one segment per write (TCP_NODELAY)
+SEGMENT_OVERHEAD = 52
+
+
+class CountingSocket:
+    """Counts the write syscalls and bytes that go through sendall."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.writes = 0
+        self.bytes = 0
+
+    def sendall(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+        self.sock.sendall(data)
+
+
+def send_per_card(cards, writer, sock):
+    for card, result in cards:
+        sock.sendall(struct.pack('!IBBHB', MAGIC_COOKIE, MSG_TYPE_PAYLOAD, result, card.rank, card.shape))
+
+
+def send_batched(cards, writer, sock):
+    for card, result in cards:
+        writer.add(PAYLOAD_STRUCT, MAGIC_COOKIE, MSG_TYPE_PAYLOAD, result, card.rank, card.shape)
+    sock.sendall(writer.flush())
+
+
+def play(send, rounds, seed):
+    random.seed(seed)
+    server_sock, client_sock = socket.socketpair()
+
+    # drain the client side so the server never blocks on a full buffer
+    def drain():
+        while client_sock.recv(65536):
+            pass
+
+    drainer = threading.Thread(target=drain, daemon=True)
+    drainer.start()
+
+    sock = CountingSocket(server_sock)
+    writer = FrameWriter()
+    session = Session(rounds)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        send(session.start_round(), writer, sock)
+        while not session.round_over:
+            total = session.game.player_hand.total()
+            cards = session.apply_decision("Hit" if total < 17 else "Stand")
+            send(cards, writer, sock)
+    elapsed = time.perf_counter() - start
+
+    server_sock.close()
+    drainer.join()
+    client_sock.close()
+
+    return {
+        "writes_per_round": sock.writes / rounds,
+        "payload_bytes_per_round": sock.bytes / rounds,
+        "wire_bytes_per_round": (sock.bytes + sock.writes * SEGMENT_OVERHEAD) / rounds,
+        "rounds_per_s": rounds / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-card vs batched payload sends")
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for label, send in (("per-card", send_per_card), ("batched", send_batched)):
+        report = play(send, args.rounds, args.seed)
+        print(f"{label:>9}: {report['writes_per_round']:.2f} writes/round | "
+              f"{report['payload_bytes_per_round']:.1f} payload B/round | "
+              f"~{report['wire_bytes_per_round']:.1f} wire B/round | "
+              f"{report['rounds_per_s']:.0f} rounds/s")
@@ -0,0 +1,131 @@
+"""
+Startup time and memory of the server and client processes.
+
+Times `python Server.py` from process start until its first offer broadcast
+arrives, and reads the server's resident memory at that point (Linux
+/proc). Also times importing the terminal client, which must not pull in
+the web UI.
+
+    python Startup.py --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT_DIR, "Server")
+CLIENT_DIR = os.path.join(ROOT_DIR, "Client")
+
+sys.path.insert(0, ROOT_DIR)
+
+from Protocol.Messages import MAGIC_COOKIE, MSG_TYPE_OFFER, OFFER_PORT, OFFER_STRUCT
+
+# run in a fresh interpreter: import time, peak RSS in kB (None without the resource
+# module, e.g. on Windows), and whether Flask got imported
+CLIENT_IMPORT = """
+import sys, time
+try:
+    import resource
+except ImportError:
+    resource = None
+start = time.perf_counter()
+import Client
+elapsed = time.perf_counter() - start
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None
+print(elapsed, peak_kb, "flask" in sys.modules)
+"""
+
+
+def rss_mb(pid):
+    """Resident memory of a process in MB, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def offer_listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        # a client running on this machine may hold the offer port too
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(('', OFFER_PORT))
+    return sock
+
+
+def server_startup(timeout=30):
+    """(seconds to the first offer, seconds to the listening line, RSS MB then) of one server start."""
+    listener = offer_listener()
+    listener.settimeout(timeout)
+    try:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "Server.py", "startup"], cwd=SERVER_DIR,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            line = proc.stdout.readline()
+            if not line.startswith("TCP listening on port"):
+                raise RuntimeError("Server exited before listening")
+            listening = time.perf_counter() - start
+            port = int(line.split()[4])
+
+            while True:
+                data, _ = listener.recvfrom(1024)
+                if len(data) < OFFER_STRUCT.size:
+                    continue
+                magic, msg_type, offer_port, _ = OFFER_STRUCT.unpack_from(data)
+                # other servers may be broadcasting on the same network
+                if magic == MAGIC_COOKIE and msg_type == MSG_TYPE_OFFER and offer_port == port:
+                    return time.perf_counter() - start, listening, rss_mb(proc.pid)
+        finally:
+            proc.kill()
+            proc.wait()
+    finally:
+        listener.close()
+
+
+def client_import():
+    """(import seconds, peak RSS MB or None, Flask imported) of the terminal client."""
+    out = subprocess.run([sys.executable, "-c", CLIENT_IMPORT], cwd=CLIENT_DIR,
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), None if out[1] == "None" else int(out[1]) / 1024, out[2] == "True"
+
+
+def bench_startup(runs=5):
+    """Median over runs, in the result format of Suite.py."""
+    servers = [server_startup() for _ in range(runs)]
+    clients = [client_import() for _ in range(runs)]
+
+    def median(samples):
+        samples = [sample for sample in samples if sample is not None]
+        return statistics.median(samples) if samples else 0.0
+
+    return {
+        "startup.server_first_offer_ms": {"value": median(s[0] for s in servers) * 1000, "unit": "ms",
+                                          "better": "lower"},
+        "startup.server_listening_ms": {"value": median(s[1] for s in servers) * 1000, "unit": "ms",
+                                        "better": "lower"},
+        "startup.server_rss_mb": {"value": median(s[2] for s in servers), "unit": "MB", "better": "lower"},
+        "startup.client_import_ms": {"value": median(c[0] for c in clients) * 1000, "unit": "ms",
+                                     "better": "lower"},
+        "startup.client_rss_mb": {"value": median(c[1] for c in clients), "unit": "MB", "better": "lower"},
+        "startup.client_imports_flask": {"value": sum(c[2] for c in clients), "unit": "runs",
+                                         "better": "lower"},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server and client startup time and memory")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, result in bench_startup(args.runs).items():
+        print(f"{name:<40} {result['value']:>12.2f} {result['unit']}")
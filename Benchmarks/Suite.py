@@ -0,0 +1,228 @@
+"""
+Benchmark suite: GameLogic, the protocol codec, end-to-end sessions and startup.
+
+Every benchmark produces one or more named results with a unit and a
+direction (lower or higher is better). Results are written as JSON together
+with the commit and interpreter they were measured on, and a previous run
+can be given as a baseline to flag regressions:
+
+    python Suite.py --output base.json
+    git checkout my-branch
+    python Suite.py --output new.json --compare base.json --threshold 0.10
+
+    python Suite.py --groups gamelogic,protocol     # no server needed
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "Server"))
+
+from GameLogic.Card import CARDS
+from GameLogic.Deck import Deck
+from GameLogic.Game import Game
+from GameLogic.Hand import Hand
+from Protocol.Framing import FrameBuffer, FrameWriter
+from Protocol.Messages import (MAGIC_COOKIE, MSG_TYPE_OFFER, MSG_TYPE_REQUEST, MSG_TYPE_PAYLOAD,
+                               MSG_TYPE_DECISION, ACTION_HIT, OFFER_STRUCT, REQUEST_STRUCT, PAYLOAD_STRUCT,
+                               DECISION_STRUCT)
+from Protocols import BinaryProtocol
+from LoadTest import start_server, run_load
+from Startup import bench_startup
+
+GROUPS = ["gamelogic", "protocol", "e2e", "startup"]
+
+
+def measure(fn, repeat=5):
+    """Best and median time per call of fn, in nanoseconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = [t / number * 1e9 for t in timer.repeat(repeat, number)]
+    return {"value": min(per_call), "median": statistics.median(per_call),
+            "unit": "ns/op", "better": "lower", "calls": number * repeat}
+
+
+def bench_gamelogic():
+    rng = random.Random(1)
+
+    deck = Deck(rng)
+    hand = Hand()
+    for card in (CARDS[0], CARDS[5], CARDS[12]):
+        hand.add_card(card)
+
+    game = Game(rng=rng)
+
+    def start():
+        game.reset()
+        game.start()
+
+    def start_stand():
+        game.reset()
+        game.start()
+        game.player_stand()
+
+    finished = Game(rng=random.Random(2))
+    finished.start()
+    finished.player_stand()
+
+    return {
+        "gamelogic.deck_construct": measure(lambda: Deck(rng)),
+        "gamelogic.deck_shuffle": measure(deck.shuffle),
+        "gamelogic.hand_total": measure(hand.total),
+        "gamelogic.game_start": measure(start),
+        "gamelogic.game_start_player_stand": measure(start_stand),
+        "gamelogic.game_result": measure(finished.result),
+    }
+
+
+def bench_protocol():
+    name = struct.pack('32s', b"benchmark")
+    offer = OFFER_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_OFFER, 50123, name)
+    request = REQUEST_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_REQUEST, 10, name)
+    payload = PAYLOAD_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_PAYLOAD, 0, 12, 3)
+
+    # the server's first turn of a round: three payloads in one buffer
+    writer = FrameWriter()
+    cards = CARDS[:3]
+
+    def pack_turn():
+        for card in cards:
+            writer.add(PAYLOAD_STRUCT, MAGIC_COOKIE, MSG_TYPE_PAYLOAD, 0, card.rank, card.shape)
+        return writer.flush()
+
+    frames = FrameBuffer()
+
+    def parse_decision():
+        frames.writable()[:3] = b"Hit"
+        frames.advance(3)
+        return frames.next_decision()
+
+    binary = BinaryProtocol()
+    decision = DECISION_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_DECISION, ACTION_HIT)
+
+    def parse_binary_decision():
+        frames.writable()[:DECISION_STRUCT.size] = decision
+        frames.advance(DECISION_STRUCT.size)
+        return binary.parse_decision(frames.next_struct(DECISION_STRUCT))
+
+    return {
+        "protocol.offer_pack": measure(lambda: OFFER_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_OFFER, 50123, name)),
+        "protocol.offer_unpack": measure(lambda: OFFER_STRUCT.unpack(offer)),
+        "protocol.request_pack": measure(lambda: REQUEST_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_REQUEST, 10, name)),
+        "protocol.request_unpack": measure(lambda: REQUEST_STRUCT.unpack(request)),
+        "protocol.payload_pack": measure(lambda: PAYLOAD_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_PAYLOAD, 0, 12, 3)),
+        "protocol.payload_unpack": measure(lambda: PAYLOAD_STRUCT.unpack(payload)),
+        "protocol.pack_turn_3_cards": measure(pack_turn),
+        "protocol.parse_decision": measure(parse_decision),
+        "protocol.parse_binary_decision": measure(parse_binary_decision),
+    }
+
+
+def bench_e2e(modes, sessions, concurrency, rounds):
+    results = {}
+    for mode in modes:
+        proc, port = start_server(mode, concurrency)
+        try:
+            report = asyncio.run(run_load("127.0.0.1", port, sessions, concurrency, rounds))
+        finally:
+            proc.kill()
+            proc.wait()
+
+        prefix = f"e2e.{mode}."
+        results[prefix + "sessions_per_s"] = {"value": report["sessions_per_s"], "unit": "sessions/s", "better": "higher"}
+        results[prefix + "rounds_per_s"] = {"value": report["rounds_per_s"], "unit": "rounds/s", "better": "higher"}
+        results[prefix + "p50_round_ms"] = {"value": report["p50_round_ms"], "unit": "ms", "better": "lower"}
+        results[prefix + "p99_round_ms"] = {"value": report["p99_round_ms"], "unit": "ms", "better": "lower"}
+        results[prefix + "failures"] = {"value": report["failures"], "unit": "sessions", "better": "lower"}
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Prints the change against the baseline and returns the names that got worse by more than threshold."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+
+        change = (result["value"] - base["value"]) / base["value"]
+        worse = change > threshold if result["better"] == "lower" else change < -threshold
+        if worse:
+            regressions.append(name)
+        print(f"{name:<40} {base['value']:>12.2f} -> {result['value']:>12.2f} {result['unit']:<10} "
+              f"{change * 100:+7.1f}%{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blackjack benchmark suite")
+    parser.add_argument("--groups", default=",".join(GROUPS),
+                        help="comma separated subset of " + ", ".join(GROUPS))
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON file of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument("--modes", default="thread,async", help="(e2e) server modes to run")
+    parser.add_argument("--sessions", type=int, default=200, help="(e2e) sessions per mode")
+    parser.add_argument("--concurrency", type=int, default=50, help="(e2e) sessions open at the same time")
+    parser.add_argument("--rounds", type=int, default=5, help="(e2e) rounds per session")
+    parser.add_argument("--runs", type=int, default=5, help="(startup) server and client starts, the median is kept")
+    args = parser.parse_args()
+
+    groups = args.groups.split(",")
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error("unknown groups: " + ", ".join(sorted(unknown)))
+
+    results = {}
+    if "gamelogic" in groups:
+        results.update(bench_gamelogic())
+    if "protocol" in groups:
+        results.update(bench_protocol())
+    if "e2e" in groups:
+        results.update(bench_e2e(args.modes.split(","), args.sessions, args.concurrency, args.rounds))
+    if "startup" in groups:
+        results.update(bench_startup(args.runs))
+
+    for name, result in results.items():
+        print(f"{name:<40} {result['value']:>12.2f} {result['unit']}")
+
+    run = {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print(f"\nagainst {args.compare} (threshold {args.threshold * 100:.0f}%):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): " + ", ".join(regressions))
+            sys.exit(1)
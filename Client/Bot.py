@@ -0,0 +1,268 @@
+"""
+Headless bot players for load generation.
+
+Runs many concurrent sessions on one asyncio loop, decides Hit/Stand from a
+policy instead of the terminal or the browser, and reports throughput,
+latency percentiles and the win rate. With --seats above 1 every session
+plays that many hands per round over the bulk protocol. Started through
+Client.py:
+
+    python Client.py bot --bot --sessions 200 --rounds 50 --policy basic
+    python Client.py bot --bot --sessions 20 --rounds 50 --seats 16
+"""
+import asyncio
+import socket
+import time
+
+from Protocol.Framing import HEADER_STRUCT
+from Protocol.Messages import (MAGIC_COOKIE, MSG_TYPE_REQUEST, MSG_TYPE_BINARY_REQUEST, MSG_TYPE_BUSY,
+                               MSG_TYPE_BULK_REQUEST, MSG_TYPE_BULK_DECISION, MSG_TYPE_DECISION, ACTION_HIT,
+                               ACTION_STAND, REQUEST_STRUCT, PAYLOAD_STRUCT, DECISION_STRUCT, BUSY_STRUCT,
+                               BULK_REQUEST_STRUCT, BULK_DECISION_STRUCT, BULK_PAYLOAD_STRUCT, BULK_CARD_STRUCT,
+                               DEALER_SEAT)
+from Discovery import Discovery
+from Strategy import load_or_build
+
+ROUND_NOT_OVER = 0x0
+RESULT_WIN = 0x3
+
+# times a session is retried after the server answered busy
+BUSY_RETRIES = 5
+
+# (hit, stand) messages of each decision format
+TEXT_DECISIONS = (b"Hit", b"Stand")
+BINARY_DECISIONS = (DECISION_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_DECISION, ACTION_HIT),
+                    DECISION_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_DECISION, ACTION_STAND))
+
+
+class ServerBusy(Exception):
+    def __init__(self, retry_after_ms):
+        super().__init__(f"server busy, retry after {retry_after_ms} ms")
+        self.retry_after_ms = retry_after_ms
+
+
+class BotHand:
+    def __init__(self):
+        self.hard = 0
+        self.aces = 0
+
+    def add(self, rank):
+        self.hard += min(rank, 10)
+        if rank == 1:
+            self.aces += 1
+
+    def is_soft(self):
+        return self.aces > 0 and self.hard <= 11
+
+    def total(self):
+        return self.hard + 10 if self.is_soft() else self.hard
+
+
+def make_policy(name):
+    """Returns decide(hand, upcard) -> True to hit."""
+    if name == "basic":
+        table = load_or_build()
+        return lambda hand, upcard: table.should_hit(hand.total(), hand.is_soft(), upcard)
+    if name == "dealer":
+        return lambda hand, upcard: hand.total() < 17
+    if name == "stand":
+        return lambda hand, upcard: False
+    raise ValueError("Unknown policy: " + name)
+
+
+class BotStats:
+    def __init__(self):
+        self.rounds = 0
+        self.wins = 0
+        self.failed_sessions = 0
+        self.busy = 0  # sessions the server turned away
+        self.first_card = []  # request sent -> first card received
+        self.response = []  # decision sent -> full response received
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def play_session(host, port, name, rounds, decide, stats, text_decisions=False):
+    reader, writer = await asyncio.open_connection(host, port)
+    sock = writer.get_extra_info("socket")
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    async def read_payload():
+        return PAYLOAD_STRUCT.unpack(await reader.readexactly(PAYLOAD_STRUCT.size))
+
+    async def read_first_payload():
+        # the first answer to a request may be a busy message instead of a card
+        header = await reader.readexactly(HEADER_STRUCT.size)
+        if HEADER_STRUCT.unpack(header)[1] == MSG_TYPE_BUSY:
+            _, _, retry_after_ms = BUSY_STRUCT.unpack(header + await reader.readexactly(BUSY_STRUCT.size - len(header)))
+            raise ServerBusy(retry_after_ms)
+        return PAYLOAD_STRUCT.unpack(header + await reader.readexactly(PAYLOAD_STRUCT.size - len(header)))
+
+    try:
+        sent = time.perf_counter()
+        request_type = MSG_TYPE_REQUEST if text_decisions else MSG_TYPE_BINARY_REQUEST
+        hit_msg, stand_msg = TEXT_DECISIONS if text_decisions else BINARY_DECISIONS
+        writer.write(REQUEST_STRUCT.pack(MAGIC_COOKIE, request_type, rounds, name))
+
+        for round_num in range(rounds):
+            hand = BotHand()
+            for i in range(3):
+                if round_num == 0 and i == 0:
+                    _, _, _, rank, _ = await read_first_payload()
+                    stats.first_card.append(time.perf_counter() - sent)
+                else:
+                    _, _, _, rank, _ = await read_payload()
+                if i < 2:
+                    hand.add(rank)
+                else:
+                    upcard = min(rank, 10)
+
+            result = ROUND_NOT_OVER
+            while result == ROUND_NOT_OVER:
+                hit = decide(hand, upcard)
+                sent = time.perf_counter()
+                writer.write(hit_msg if hit else stand_msg)
+
+                _, _, result, rank, _ = await read_payload()
+                if hit:
+                    hand.add(rank)
+                while not hit and result == ROUND_NOT_OVER:
+                    _, _, result, _, _ = await read_payload()
+                stats.response.append(time.perf_counter() - sent)
+
+            stats.rounds += 1
+            if result == RESULT_WIN:
+                stats.wins += 1
+    finally:
+        writer.close()
+
+
+async def play_bulk_session(host, port, name, rounds, seats, decide, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    sock = writer.get_extra_info("socket")
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    async def read_turn():
+        """Returns the (seat, result, rank, shape) entries of one server turn."""
+        header = await reader.readexactly(HEADER_STRUCT.size)
+        if HEADER_STRUCT.unpack(header)[1] == MSG_TYPE_BUSY:
+            _, _, retry_after_ms = BUSY_STRUCT.unpack(header + await reader.readexactly(BUSY_STRUCT.size - len(header)))
+            raise ServerBusy(retry_after_ms)
+
+        _, _, count = BULK_PAYLOAD_STRUCT.unpack(header + await reader.readexactly(BULK_PAYLOAD_STRUCT.size - len(header)))
+        return BULK_CARD_STRUCT.iter_unpack(await reader.readexactly(count * BULK_CARD_STRUCT.size))
+
+    try:
+        sent = time.perf_counter()
+        writer.write(BULK_REQUEST_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_BULK_REQUEST, rounds, seats, name))
+
+        for round_num in range(rounds):
+            hands = [BotHand() for _ in range(seats)]
+            for seat, _, rank, _ in await read_turn():
+                if seat == DEALER_SEAT:
+                    upcard = min(rank, 10)
+                else:
+                    hands[seat].add(rank)
+            if round_num == 0:
+                stats.first_card.append(time.perf_counter() - sent)
+
+            waiting = set(range(seats))
+            while waiting:
+                # one bitmask for all waiting seats; a seat that stands waits for the final turn
+                hit_mask = 0
+                for seat in list(waiting):
+                    if decide(hands[seat], upcard):
+                        hit_mask |= 1 << seat
+                    else:
+                        waiting.discard(seat)
+                sent = time.perf_counter()
+                writer.write(BULK_DECISION_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_BULK_DECISION, hit_mask))
+
+                for seat, result, rank, _ in await read_turn():
+                    if seat == DEALER_SEAT:
+                        continue
+                    if rank:
+                        hands[seat].add(rank)
+                    if result != ROUND_NOT_OVER:
+                        waiting.discard(seat)
+                        stats.rounds += 1
+                        if result == RESULT_WIN:
+                            stats.wins += 1
+                stats.response.append(time.perf_counter() - sent)
+    finally:
+        writer.close()
+
+
+async def run_sessions(pick_server, name, sessions, rounds, decide, stats, seats=1):
+    async def one_session():
+        for _ in range(BUSY_RETRIES + 1):
+            server, release = pick_server()
+            busy_for = 0
+            try:
+                if seats > 1:
+                    await play_bulk_session(server[0], server[1], name, rounds, seats, decide, stats)
+                else:
+                    await play_session(server[0], server[1], name, rounds, decide, stats, server[2])
+                return
+            except ServerBusy as e:
+                stats.busy += 1
+                busy_for = e.retry_after_ms / 1000
+            except (OSError, asyncio.IncompleteReadError):
+                stats.failed_sessions += 1
+                return
+            finally:
+                release(busy_for)
+            await asyncio.sleep(busy_for)
+        stats.failed_sessions += 1
+
+    await asyncio.gather(*(one_session() for _ in range(sessions)))
+
+
+def run_bots(name, sessions, rounds, policy, host=None, port=None, pick_policy="load", seats=1,
+             decisions="auto"):
+    """decisions: "auto" sends binary decisions only to servers advertising them, so --host/--port gets text."""
+    if host is not None and port is not None:
+        def pick_server():
+            return (host, port, decisions != "binary"), lambda busy_for: None
+    else:
+        print("Listening for offer requests...")
+        discovery = Discovery().start()
+        if discovery.wait_for_server(timeout=10) is None:
+            raise SystemExit("No server found")
+        # one more broadcast period, so every server on the LAN is in the table
+        time.sleep(1.5)
+        for server in discovery.servers():
+            print(f"Server found: {server}")
+
+        def pick_server():
+            server = discovery.pick(pick_policy)
+            discovery.session_started(server)
+
+            def release(busy_for):
+                discovery.session_finished(server)
+                if busy_for:
+                    discovery.backoff(server, busy_for)
+            return (server.address, server.port, server.use_text_decisions(decisions)), release
+
+    stats = BotStats()
+    # cut to the 32 bytes of the request on a character boundary
+    client_name = name.encode('utf-8')[:32].decode('utf-8', 'ignore').encode('utf-8')
+
+    start = time.perf_counter()
+    asyncio.run(run_sessions(pick_server, client_name, sessions, rounds, make_policy(policy), stats, seats))
+    elapsed = time.perf_counter() - start
+
+    print(f"{sessions} sessions x {rounds} rounds x {seats} seats ({stats.failed_sessions} sessions failed, "
+          f"{stats.busy} busy answers) in {elapsed:.2f}s")
+    print(f"  throughput: {stats.rounds / elapsed:.1f} hands/s, {len(stats.response) / elapsed:.1f} decisions/s")
+    for label, samples in (("request->first card", stats.first_card), ("decision->response", stats.response)):
+        print(f"  {label:>19}: p50 {percentile(samples, 50) * 1000:.2f} ms | "
+              f"p90 {percentile(samples, 90) * 1000:.2f} ms | p99 {percentile(samples, 99) * 1000:.2f} ms")
+    if stats.rounds:
+        print(f"  win rate ({policy}): {stats.wins / stats.rounds * 100:.2f}%")
+    return stats
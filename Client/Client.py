@@ -10,47 +10,40 @@ import urllib.request  # <--- Added for sending API requests
 import urllib.error
 
 # ==============================================================================
-# 1. SETUP PATHS & IMPORT WEB SERVER
+# 1. SETUP PATHS
 # ==============================================================================
-try:
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+current_dir = os.path.dirname(os.path.abspath(__file__))
 
-    # Robustly find 'web_game' (Sibling or Child)
-    possible_paths = [
-        os.path.abspath(os.path.join(current_dir, '../web_game')),
-        os.path.abspath(os.path.join(current_dir, 'web_game'))
-    ]
-
-    web_game_path = None
-    for path in possible_paths:
-        if os.path.exists(os.path.join(path, 'web_server.py')):
-            web_game_path = path
-            break
-
-    if not web_game_path:
-        raise FileNotFoundError("Could not find 'web_game/web_server.py'")
+# the shared protocol package lives next to Server/ and Client/
+root_path = os.path.dirname(current_dir)
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
 
-    if web_game_path not in sys.path:
-        sys.path.insert(0, web_game_path)
+from Protocol.Framing import SocketReader
+from Protocol.Messages import (MAGIC_COOKIE, MSG_TYPE_REQUEST, MSG_TYPE_BINARY_REQUEST, MSG_TYPE_BUSY,
+                               MSG_TYPE_DECISION, ACTION_HIT, ACTION_STAND, REQUEST_STRUCT,
+                               PAYLOAD_STRUCT, DECISION_STRUCT, BUSY_STRUCT)
+from Discovery import Discovery
 
-    import web_server  #
-
-except Exception as e:
-    print(f"\n[ERROR] Failed to load web_server: {e}\n")
-    sys.exit(1)
+# the Flask web UI, imported by load_web_server() only when it is enabled:
+# Flask alone takes longer to import than the rest of the client
+web_server = None
 
 # ==============================================================================
 # 2. SHARED QUEUE & PATCH LOGIC
 # ==============================================================================
+# Terminal lines, browser round requests and browser Hit/Stand clicks all
+# arrive on this one queue, so the client blocks on a single source.
 input_queue = queue.Queue()
 
 
 def patch_web_server():
     """
-    Hooks the /connect endpoint.
+    Hooks the /connect, /hit and /stand endpoints.
     Logic:
     - If request comes from Browser: Put in Queue (Wake up Client), Update State.
     - If request comes from Terminal: Just Update State (Don't Queue).
+    - Hit/Stand clicks go straight into the Queue.
     """
     from flask import request, jsonify
 
@@ -73,27 +66,65 @@ def patch_web_server():
                 print(f"[Web API] Sync Request: Updating state to {rounds} rounds.")
 
             # --- Original Server Logic (Updates State) ---
-            web_server.game_state["rounds"] = rounds
-            web_server.game_state["connected"] = True
+            web_server.set_connected(rounds)
             # ---------------------------------------------
 
             return jsonify({"ok": True})
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    def hooked_hit_cmd():
+        input_queue.put(("WEB", "Hit"))
+        return jsonify({"status": "command_sent"})
+
+    def hooked_stand_cmd():
+        input_queue.put(("WEB", "Stand"))
+        return jsonify({"status": "command_sent"})
+
     # Apply Hook
     web_server.app.view_functions['initiate_game'] = hooked_initiate_game
+    web_server.app.view_functions['hit_cmd'] = hooked_hit_cmd
+    web_server.app.view_functions['stand_cmd'] = hooked_stand_cmd
+
+
+def load_web_server():
+    """Imports web_game/web_server.py and hooks its endpoints, once. Returns False if it cannot be loaded."""
+    global web_server
+    if web_server is not None:
+        return True
+
+    # Robustly find 'web_game' (Sibling or Child)
+    possible_paths = [
+        os.path.abspath(os.path.join(current_dir, '../web_game')),
+        os.path.abspath(os.path.join(current_dir, 'web_game'))
+    ]
+
+    web_game_path = None
+    for path in possible_paths:
+        if os.path.exists(os.path.join(path, 'web_server.py')):
+            web_game_path = path
+            break
+
+    try:
+        if not web_game_path:
+            raise FileNotFoundError("Could not find 'web_game/web_server.py'")
 
+        if web_game_path not in sys.path:
+            sys.path.insert(0, web_game_path)
 
-patch_web_server()
+        import web_server as module
+    except Exception as e:
+        print(f"\n[ERROR] Failed to load web_server: {e}\n")
+        return False
+
+    web_server = module
+    patch_web_server()
+    return True
 
 # ==============================================================================
 # 3. CLIENT LOGIC
 # ==============================================================================
 
-with open("../config.json", "r") as f:  #
-    config_params = json.load(f)
-
 SHAPES = ["Heart", "Diamond", "Club", "Spade"]
 
 
@@ -112,31 +143,17 @@ def card_to_string(rank, shape):
 
 
 def generate_client_name(name):
-    return struct.pack('32s', name.encode('utf-8'))
+    # struct would cut the name at 32 bytes, possibly inside a character
+    return struct.pack('32s', name.encode('utf-8')[:32].decode('utf-8', 'ignore').encode('utf-8'))
 
 
 def generate_request_msg(magic_cookie, msg_type, rounds, client_name):
-    return struct.pack('! I B B 32s', magic_cookie, msg_type, rounds, client_name)
-
-
-def check_cookie(magic_cookie):
-    return magic_cookie == int(config_params["magic_cookie"], 16)
-
-
-def recv_exact(sock, size):
-    data = b''
-    while len(data) < size:
-        chunk = sock.recv(size - len(data))
-        if not chunk: return None
-        data += chunk
-    return data
+    return REQUEST_STRUCT.pack(magic_cookie, msg_type, rounds, client_name)
 
 
-def recv_payload(sock):
-    data = recv_exact(sock, 9)
-    if not data: return None
-    magic, msg_type, result, rank, shape = struct.unpack('!IBBHB', data)
-    return magic, msg_type, result, rank, shape
+def recv_payload(reader):
+    # (magic, msg_type, result, rank, shape), or None once the server disconnects
+    return reader.read_struct(PAYLOAD_STRUCT)
 
 
 
@@ -147,46 +164,33 @@ def result_to_string(result):
     return None
 
 
-def run_server(name):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    sock.bind(('', 13122))
+# decision messages are constant, pack them once
+BINARY_DECISIONS = {
+    "Hit": DECISION_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_DECISION, ACTION_HIT),
+    "Stand": DECISION_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_DECISION, ACTION_STAND),
+}
+
+
+def run_server(name, pick_policy="latency", decisions="auto", web=True):
+    # offers are collected in the background, so after a session the next
+    # server is picked from the cache instead of waiting for a broadcast
+    discovery = Discovery().start()
+    if web and not load_web_server():
+        print("[Client] Continuing without the web UI")
+        web = False
 
     client_name = generate_client_name(name)
     web_server_started = False
 
     def ask_player_decision():
-        print("Action: (Type 'hit'/'stand' or click in Browser)...")
-
+        print("Action: (Type 'hit'/'stand' or click in Browser)..." if web else "Action: (Type 'hit'/'stand')...")
 
         while True:
-            # --- 1. Check Web UI ---
-            # We wrap this in a try-except to prevent crashes if web_server isn't ready
-            try:
-                if web_server_started:
-                    # Debug print to prove we are checking (remove later if too spammy)
-                    # print("[DEBUG] Checking Web Queue...")
-
-                    if not web_server.game_state["ui_commands"].empty():
-                        cmd = web_server.game_state["ui_commands"].get()
-                        return cmd
-                else:
-                    # If this prints, your web server thread hasn't started yet
-                    # print("[DEBUG] Web server flag is False")
-                    pass
-            except Exception as e:
-                pass
-            # --- 2. Check Terminal ---
-            if not input_queue.empty():
-
-                data = input_queue.get()
-
-                source, cmd = data
-                if isinstance(cmd, str) and cmd.lower() in ["hit", "stand"]:
-                    return cmd.capitalize()
-
-            time.sleep(0.1)
+            # Blocks until the terminal or the browser sends something,
+            # the decision is forwarded the moment it arrives
+            source, cmd = input_queue.get()
+            if isinstance(cmd, str) and cmd.lower() in ["hit", "stand"]:
+                return cmd.capitalize()
 
     # -------------------------------------------------------------
     # HELPER: Sync Terminal Input to Web Server
@@ -210,29 +214,32 @@ def run_server(name):
             print(f"[Warning] Could not sync to Web Server: {e}")
 
     # -------------------------------------------------------------
-    # CONNECT FUNCTION
+    # 1. Listen for Terminal Input (one reader for the whole run)
     # -------------------------------------------------------------
-    def connect_to_server(server_ip, server_port, magic_cookie):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((server_ip, server_port))
+    def terminal_input_listener():
+        while True:
+            try:
+                user_text = sys.stdin.readline()
+                if user_text:
+                    input_queue.put(("TERMINAL", user_text.strip()))
+            except:
+                break
 
-        # 1. Listen for Terminal Input
-        def terminal_input_listener():
-            while True:
-                try:
-                    user_text = sys.stdin.readline()
-                    if user_text:
-                        input_queue.put(("TERMINAL", user_text.strip()))
-                except:
-                    break
+    t_input = threading.Thread(target=terminal_input_listener)
+    t_input.daemon = True
+    t_input.start()
 
-        t_input = threading.Thread(target=terminal_input_listener)
-        t_input.daemon = True
-        t_input.start()
+    # -------------------------------------------------------------
+    # ROUNDS PROMPT
+    # -------------------------------------------------------------
+    def ask_rounds():
+        # asked before connecting: the server evicts connections that take too long to send their request
         print("Enter number of rounds: ", end='', flush=True)
 
-        # 2. Wait for Input (Blocking)
+        # 2. Wait for Input (Blocking); Hit/Stand clicks in the browser are no answer to this prompt
         source, raw_value = input_queue.get()
+        while source == "WEB" and raw_value in ("Hit", "Stand"):
+            source, raw_value = input_queue.get()
 
         try:
             rounds = int(raw_value)
@@ -243,28 +250,33 @@ def run_server(name):
         # 3. Handle Source
         if source == "WEB":
             print(f"{rounds} (Received via Web Interface)")
-        else:
+        elif web_server_started:
             # TERMINAL -> Send API Request to Web Server
             sync_to_web_server(rounds)
+        return rounds
 
-        request_msg = generate_request_msg(magic_cookie, int(config_params["msg_type_request"], 16), rounds,
+    # -------------------------------------------------------------
+    # CONNECT FUNCTION
+    # -------------------------------------------------------------
+    def connect_to_server(server_ip, server_port, magic_cookie, rounds, text_decisions):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.connect((server_ip, server_port))
+
+        # the request type tells the server which decision format follows
+        request_type = MSG_TYPE_REQUEST if text_decisions else MSG_TYPE_BINARY_REQUEST
+        request_msg = generate_request_msg(magic_cookie, request_type, rounds,
                                            client_name)
         sock.sendall(request_msg)
-        return sock, rounds
+        return sock
 
+    rounds = None  # kept when the server was busy and the session is retried
     while True:
         print("Listening for offer requests...")
-        data, addr = sock.recvfrom(39)
-
-        magic_cookie, msg_type, server_port, server_name = struct.unpack('! I B H 32s', data)
-        server_name = server_name.rstrip(b'\x00').decode('utf-8')
-        print(f"Server found: {server_name}, TCP port: {server_port}")
-
-        if not check_cookie(magic_cookie):
-            continue
+        server = discovery.wait_for_server(pick_policy)
+        print(f"Server found: {server}")
 
         # === START FLASK THREAD ===
-        if not web_server_started:
+        if web and not web_server_started:
             try:
                 import logging
                 log = logging.getLogger('werkzeug')
@@ -281,7 +293,28 @@ def run_server(name):
             except Exception as e:
                 print(f"[Error] Failed to start web server: {e}")
 
-        game_socket, rounds = connect_to_server(addr[0], server_port, magic_cookie)
+        if rounds is None:
+            rounds = ask_rounds()
+            # the answer may have taken a while, pick from the offers that are current now
+            server = discovery.wait_for_server(pick_policy)
+
+        text_decisions = server.use_text_decisions(decisions)
+        try:
+            game_socket = connect_to_server(server.address, server.port, MAGIC_COOKIE, rounds, text_decisions)
+        except OSError as e:
+            print(f"Could not connect to {server.name}: {e}")
+            discovery.forget(server)
+            continue
+        discovery.session_started(server)
+        game_reader = SocketReader(game_socket)
+
+        if game_reader.peek_type() == MSG_TYPE_BUSY:
+            _, _, retry_after_ms = game_reader.read_struct(BUSY_STRUCT)
+            print(f"{server.name} is busy, trying again in {retry_after_ms} ms")
+            game_socket.close()
+            discovery.session_finished(server)
+            discovery.backoff(server, retry_after_ms / 1000)
+            continue
 
         print("Sending request...")
         player_cards = []
@@ -296,7 +329,7 @@ def run_server(name):
             web_initial_cards = []
 
             for i in range(3):
-                payload = recv_payload(game_socket)
+                payload = recv_payload(game_reader)
                 if not payload:
                     print("Server disconnected")
                     break
@@ -321,18 +354,16 @@ def run_server(name):
 
             # 3. CRITICAL FIX: Update State AND Signal the Event
             if web_server_started:
-                web_server.game_state["initial_cards"] = web_initial_cards
-
-                # This stops the 503 Error! It tells Flask "Data is ready!"
-                web_server.game_state["evt_start_ready"].set()
+                # Pushed on /events right away, and kept for /status pollers
+                web_server.push_update("start", web_initial_cards)
 
             round_over = False
             while not round_over:
                 decision = ask_player_decision()
-                game_socket.sendall(decision.encode())
+                game_socket.sendall(decision.encode() if text_decisions else BINARY_DECISIONS[decision])
 
                 if decision == "Hit":
-                    payload = recv_payload(game_socket)
+                    payload = recv_payload(game_reader)
                     if not payload: break
 
                     magic, msg_type, result, rank, shape = payload
@@ -348,8 +379,7 @@ def run_server(name):
                             "result": result
                         }
                         # 2. Update state and trigger event
-                        web_server.game_state["hit_card"] = card_data
-                        web_server.game_state["evt_hit_ready"].set()
+                        web_server.push_update("hit", card_data)
 
 
                     # -----------------------
@@ -366,7 +396,7 @@ def run_server(name):
                     web_dealer_cards = []  # Collect all dealer cards here
 
                     while True:
-                        payload = recv_payload(game_socket)
+                        payload = recv_payload(game_reader)
                         if not payload: break
 
                         magic, msg_type, result, rank, shape = payload
@@ -390,22 +420,51 @@ def run_server(name):
 
                             # --- SYNC STAND TO WEB (Full Sequence) ---
                             if web_server_started:
-                                web_server.game_state["stand_cards"] = web_dealer_cards
-                                web_server.game_state["evt_stand_ready"].set()
+                                web_server.push_update("stand", web_dealer_cards)
                             # -----------------------------------------
 
                             break
         print(f"Finished playing {rounds} rounds, win rate: {(wins / rounds) * 100}%")
-        web_server.game_state["win_rate"] = wins / rounds * 100
-        try:
-            urllib.request.urlopen("http://127.0.0.1:5000/shutdown", data=b"")
+        game_socket.close()
+        discovery.session_finished(server)
+        if web_server_started:
+            web_server.set_win_rate(wins / rounds * 100)
+            try:
+                urllib.request.urlopen("http://127.0.0.1:5000/shutdown", data=b"")
 
-        except:
-            pass
+            except:
+                pass
+        rounds = None
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        raise SystemExit("Usage: python Client.py <name>")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Blackjack client")
+    parser.add_argument("name", help="player name sent to the server")
+    parser.add_argument("--no-web", action="store_true",
+                        help="terminal only, do not load or start the web UI")
+    parser.add_argument("--bot", action="store_true",
+                        help="headless load generator: no web UI, policy decides Hit/Stand")
+    parser.add_argument("--sessions", type=int, default=1, help="(bot) concurrent sessions")
+    parser.add_argument("--rounds", type=int, default=10, choices=range(1, 256), metavar="1-255",
+                        help="(bot) rounds per session")
+    parser.add_argument("--policy", default="basic", choices=["basic", "dealer", "stand"],
+                        help="(bot) hit/stand policy")
+    parser.add_argument("--seats", type=int, default=1, choices=range(1, 33), metavar="1-32",
+                        help="(bot) hands per round and session, above 1 uses the bulk protocol")
+    parser.add_argument("--decisions", choices=["auto", "text", "binary"], default="auto",
+                        help="Hit/Stand format: auto sends binary to servers advertising it in their offer "
+                             "(Server.py --advertise-features) and text otherwise, including servers given "
+                             "with --host/--port")
+    parser.add_argument("--pick", choices=["latency", "load"],
+                        help="which discovered server to play on (default: latency, load with --bot)")
+    parser.add_argument("--host", help="(bot) server address, skips waiting for an offer")
+    parser.add_argument("--port", type=int, help="(bot) server TCP port")
+    args = parser.parse_args()
+
+    if args.bot:
+        from Bot import run_bots
+        run_bots(args.name, args.sessions, args.rounds, args.policy, args.host, args.port, args.pick or "load",
+                 args.seats, args.decisions)
     else:
-        name = sys.argv[1]
-        run_server(name)
\ No newline at end of file
+        run_server(args.name, args.pick or "latency", args.decisions, not args.no_web)
\ No newline at end of file
@@ -0,0 +1,191 @@
+import random
+import socket
+import threading
+import time
+
+from Protocol.Messages import (MAGIC_COOKIE, MSG_TYPE_PING, MSG_TYPE_PONG, OFFER_PORT, OFFER_STRUCT,
+                               OFFER_LOAD_STRUCT, OFFER_FEATURES_STRUCT, FEATURE_BINARY_DECISIONS, PING_STRUCT)
+
+# a server that has not re-broadcast for this long is considered gone
+DEFAULT_TTL = 3.0
+# capacity assumed for servers that do not advertise their load (the server's default --max-sessions)
+DEFAULT_CAPACITY = 8
+# a ping not answered by then is lost, or the server is too old to answer pings
+PROBE_TIMEOUT = 2.0
+
+
+class ServerInfo:
+    def __init__(self, name, address, port, offer_addr=None):
+        self.name = name
+        self.address = address
+        self.port = port
+        self.offer_addr = offer_addr  # (address, udp port) the offers come from, answers pings
+        self.last_seen = time.monotonic()
+        self.rtt = None  # ping round trip in seconds, None until probed
+        self.sessions = 0  # sessions this client currently has open on it
+        # advertised by servers started with --advertise-load, None otherwise
+        self.active = None
+        self.capacity = None
+        self.latency_ms = None
+        self.started_since_offer = 0  # our sessions the last advertised load does not include yet
+        self.busy_until = 0.0  # set when the server turned a session away
+        self.binary_decisions = False  # advertised in the offer, older servers only read text
+
+    def load(self):
+        """Fraction of the server's seats taken, as far as this client knows."""
+        if self.capacity is None:
+            return self.sessions / DEFAULT_CAPACITY
+        return (self.active + self.started_since_offer) / max(self.capacity, 1)
+
+    def update(self, offer):
+        """Takes the optional load and feature tails of a new offer from this server."""
+        self.last_seen = time.monotonic()
+        tail = len(offer) - OFFER_STRUCT.size
+        if tail >= OFFER_LOAD_STRUCT.size:
+            self.active, self.capacity, self.latency_ms = OFFER_LOAD_STRUCT.unpack_from(offer, OFFER_STRUCT.size)
+            self.started_since_offer = 0
+        if tail in (OFFER_FEATURES_STRUCT.size, OFFER_LOAD_STRUCT.size + OFFER_FEATURES_STRUCT.size):
+            features, = OFFER_FEATURES_STRUCT.unpack_from(offer, len(offer) - OFFER_FEATURES_STRUCT.size)
+            self.binary_decisions = bool(features & FEATURE_BINARY_DECISIONS)
+
+    def use_text_decisions(self, decisions="auto"):
+        """auto: binary only when the offer advertised it, so older servers keep getting text."""
+        return decisions == "text" or (decisions == "auto" and not self.binary_decisions)
+
+    def __str__(self):
+        rtt = f"{self.rtt * 1000:.2f} ms" if self.rtt is not None else "?"
+        text = f"{self.name} ({self.address}:{self.port}, rtt {rtt}, {self.sessions} sessions"
+        if self.capacity is not None:
+            text += f", load {self.active}/{self.capacity}, round {self.latency_ms} ms"
+        return text + ")"
+
+
+class Discovery:
+    """
+    Listens for server offers in the background and keeps a table of live
+    servers, so the client can pick one and reconnect at once instead of
+    waiting for the next broadcast.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, probe_rtt=True):
+        self.ttl = ttl
+        self.probe_rtt = probe_rtt
+        self.table = {}  # (address, port) -> ServerInfo
+        self.changed = threading.Condition()
+
+    def start(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('', OFFER_PORT))
+
+        threading.Thread(target=self._listen, args=(sock,), daemon=True).start()
+        return self
+
+    def _listen(self, sock):
+        while True:
+            data, addr = sock.recvfrom(1024)
+            self._offer(data, addr)
+
+    def _offer(self, data, addr):
+        if len(data) < OFFER_STRUCT.size:
+            return
+
+        magic_cookie, msg_type, server_port, server_name = OFFER_STRUCT.unpack_from(data)
+        if magic_cookie != MAGIC_COOKIE:
+            return
+
+        key = (addr[0], server_port)
+        with self.changed:
+            server = self.table.get(key)
+            if server is None:
+                # a name that is not valid UTF-8 must not take the listener down
+                name = server_name.rstrip(b'\x00').decode('utf-8', errors='replace')
+                server = ServerInfo(name, addr[0], server_port, addr)
+                self.table[key] = server
+                if self.probe_rtt:
+                    threading.Thread(target=self._probe, args=(server,), daemon=True).start()
+            server.offer_addr = addr
+            server.update(data)
+            self.changed.notify_all()
+
+    def _probe(self, server):
+        """Measures the round trip of a UDP ping to a newly seen server; a TCP connect would take a seat."""
+        token = random.getrandbits(64)
+        pong = PING_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_PONG, token)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(PROBE_TIMEOUT)
+            start = time.perf_counter()
+            try:
+                sock.sendto(PING_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_PING, token), server.offer_addr)
+                while sock.recv(64) != pong:
+                    pass
+            except OSError:
+                return
+            rtt = time.perf_counter() - start
+        with self.changed:
+            server.rtt = rtt
+            self.changed.notify_all()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, server in self.table.items() if now - server.last_seen > self.ttl]:
+            del self.table[key]
+
+    def servers(self):
+        with self.changed:
+            self._evict()
+            return list(self.table.values())
+
+    def pick(self, policy="latency"):
+        """
+        Returns the best live server, or None if none is known.
+        latency: lowest ping RTT; load: lowest share of seats taken, skipping full
+        servers while any has room, using the advertised load when servers send it.
+        """
+        with self.changed:
+            self._evict()
+            if not self.table:
+                return None
+
+            def rtt(server):
+                return server.rtt if server.rtt is not None else float("inf")
+
+            now = time.monotonic()
+            if policy == "load":
+                return min(self.table.values(), key=lambda server: (
+                    server.busy_until > now, server.load() >= 1, server.load(), server.latency_ms or 0, rtt(server)))
+            return min(self.table.values(), key=lambda server: (server.busy_until > now, rtt(server), server.sessions))
+
+    def wait_for_server(self, policy="latency", timeout=None):
+        """Blocks until a live server is known; returns at once when the table already has one."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.changed:
+            while True:
+                server = self.pick(policy)
+                if server is not None:
+                    return server
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.changed.wait(remaining if remaining is not None else self.ttl)
+
+    def session_started(self, server):
+        with self.changed:
+            server.sessions += 1
+            server.started_since_offer += 1
+
+    def session_finished(self, server):
+        with self.changed:
+            server.sessions -= 1
+
+    def backoff(self, server, seconds):
+        """Prefers other servers for a while after this one answered busy."""
+        with self.changed:
+            server.busy_until = time.monotonic() + seconds
+
+    def forget(self, server):
+        """Drops a server that refused or broke a connection until it broadcasts again."""
+        with self.changed:
+            self.table.pop((server.address, server.port), None)
@@ -0,0 +1,271 @@
+"""
+Exact hit/stand tables for the server's rules.
+
+The dealer's final-total distribution for every up-card is computed once by
+recursion over the cards still to be drawn, under Game.player_stand's rule
+(hit below 17, stand on every 17) and with no hole-card peek, matching
+Game. The stand and hit EVs of every (player total, soft, up-card) situation
+are derived from it, kept in one flat float array for O(1) lookups and
+cached on disk in a small binary file.
+
+Two modes:
+  * infinite deck: every draw has the same odds (the default);
+  * finite shoe: composition dependent, drawing removes the card from the
+    given composition. The composition is the shoe the player is drawing
+    from; the dealer's up-card is taken out of it for each column.
+
+Used by the bots, so it lives on the client side and needs only the standard
+library. From the Client directory:
+
+    python Strategy.py            # infinite deck chart
+    python Strategy.py --decks 1  # single deck, composition dependent
+"""
+import argparse
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from functools import lru_cache
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "strategy_cache")
+
+# header: magic, format version, mode, card counts for values 1..10 (zeros for an infinite deck)
+HEADER_STRUCT = struct.Struct('<4sBB10H')
+MAGIC = b"BJST"
+VERSION = 1
+MODE_INFINITE = 0
+MODE_COMPOSITION = 1
+
+# dealer outcomes: final 17, 18, 19, 20, 21, bust
+DEALER_OUTCOMES = 6
+BUST = 5
+
+# flat table layout: [total 0..21][soft 0..1][up-card 0..10][stand, hit]
+TOTALS = 22
+UPCARDS = 11
+# header, then the float32 table and dealer distributions
+FILE_SIZE = HEADER_STRUCT.size + (TOTALS * 2 * UPCARDS * 2 + UPCARDS * DEALER_OUTCOMES) * 4
+
+# odds of drawing each value 1 (ace) .. 10 from an infinite deck
+INFINITE_ODDS = tuple(4 / 13 if value == 10 else 1 / 13 for value in range(1, 11))
+
+
+def shoe_composition(decks):
+    """Card counts for values 1..10 of a full shoe."""
+    return tuple(16 * decks if value == 10 else 4 * decks for value in range(1, 11))
+
+
+def _total(hard, ace):
+    return hard + 10 if ace and hard <= 11 else hard
+
+
+def _draws(composition):
+    """(value, probability, composition after the draw) for every possible next card."""
+    if composition is None:
+        return [(value, odds, None) for value, odds in zip(range(1, 11), INFINITE_ODDS)]
+
+    remaining = sum(composition)
+    if remaining == 0:
+        raise ValueError("Composition ran out of cards")
+
+    draws = []
+    for index, count in enumerate(composition):
+        if count:
+            after = composition[:index] + (count - 1,) + composition[index + 1:]
+            draws.append((index + 1, count / remaining, after))
+    return draws
+
+
+def _remove(composition, value):
+    if composition is None:
+        return None
+    if composition[value - 1] == 0:
+        raise ValueError("Composition has no card of value %d" % value)
+    return composition[:value - 1] + (composition[value - 1] - 1,) + composition[value:]
+
+
+@lru_cache(maxsize=None)
+def _dealer(hard, ace, composition):
+    total = _total(hard, ace)
+    if hard > 21:
+        return (0.0,) * BUST + (1.0,)
+    if total >= 17:
+        return tuple(1.0 if i == total - 17 else 0.0 for i in range(DEALER_OUTCOMES))
+
+    outcome = [0.0] * DEALER_OUTCOMES
+    for value, odds, after in _draws(composition):
+        for i, p in enumerate(_dealer(hard + value, ace or value == 1, after)):
+            outcome[i] += odds * p
+    return tuple(outcome)
+
+
+def dealer_distribution(upcard, composition=None):
+    """Final dealer distribution (17..21, bust) given the up-card; the hole card is still to come."""
+    return _dealer(upcard, upcard == 1, composition)
+
+
+@lru_cache(maxsize=None)
+def _stand_ev(total, upcard, composition):
+    if total > 21:
+        return -1.0
+
+    outcome = dealer_distribution(upcard, composition)
+    win = outcome[BUST] + sum(outcome[i] for i in range(BUST) if 17 + i < total)
+    loss = sum(outcome[i] for i in range(BUST) if 17 + i > total)
+    return win - loss
+
+
+@lru_cache(maxsize=None)
+def _hit_ev(hard, ace, upcard, composition):
+    ev = 0.0
+    for value, odds, after in _draws(composition):
+        next_hard = hard + value
+        if next_hard > 21:
+            ev -= odds
+            continue
+
+        next_ace = ace or value == 1
+        stand = _stand_ev(_total(next_hard, next_ace), upcard, after)
+        ev += odds * max(stand, _hit_ev(next_hard, next_ace, upcard, after))
+    return ev
+
+
+class StrategyTable:
+    """Stand/hit EV for every situation, with O(1) lookups into one flat array."""
+
+    def __init__(self, values, dealer, composition=None):
+        self.values = values
+        self.dealer = dealer
+        self.composition = composition
+
+    @staticmethod
+    def _index(total, soft, upcard):
+        return ((total * 2 + soft) * UPCARDS + upcard) * 2
+
+    def lookup(self, total, soft, upcard):
+        """Returns (stand EV, hit EV); up-card 1 is an ace."""
+        # the table has no entry for situations no hand can be in, e.g. a soft total below 12
+        if not 4 <= total <= 21 or not 1 <= upcard <= 10 or (soft and total < 12):
+            raise ValueError("No hand is %s %d against up-card %d" % ("soft" if soft else "hard", total, upcard))
+        index = self._index(total, int(soft), upcard)
+        return self.values[index], self.values[index + 1]
+
+    def should_hit(self, total, soft, upcard):
+        stand, hit = self.lookup(total, soft, upcard)
+        return hit > stand
+
+    def dealer_distribution(self, upcard):
+        return tuple(self.dealer[upcard * DEALER_OUTCOMES:(upcard + 1) * DEALER_OUTCOMES])
+
+    def save(self, path):
+        mode = MODE_INFINITE if self.composition is None else MODE_COMPOSITION
+        counts = self.composition or (0,) * 10
+
+        values, dealer = array('f', self.values), array('f', self.dealer)
+        if sys.byteorder == "big":
+            values.byteswap()
+            dealer.byteswap()
+
+        # written next to the final path and renamed into place, so an interrupted or
+        # concurrent build never leaves a partial file under that name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER_STRUCT.pack(MAGIC, VERSION, mode, *counts))
+                values.tofile(f)
+                dealer.tofile(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        if os.path.getsize(path) != FILE_SIZE:
+            raise ValueError("Truncated strategy table: " + path)
+        with open(path, "rb") as f:
+            magic, version, mode, *counts = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not a strategy table: " + path)
+
+            values, dealer = array('f'), array('f')
+            values.fromfile(f, TOTALS * 2 * UPCARDS * 2)
+            dealer.fromfile(f, UPCARDS * DEALER_OUTCOMES)
+
+        if sys.byteorder == "big":
+            values.byteswap()
+            dealer.byteswap()
+
+        return cls(values, dealer, tuple(counts) if mode == MODE_COMPOSITION else None)
+
+
+def build_table(composition=None):
+    """Computes the full table; composition=None is an infinite deck."""
+    composition = tuple(composition) if composition is not None else None
+    values = array('f', [float("nan")]) * (TOTALS * 2 * UPCARDS * 2)
+    dealer = array('f', [0.0]) * (UPCARDS * DEALER_OUTCOMES)
+
+    for upcard in range(1, 11):
+        # the dealer's up-card is no longer in the shoe
+        shoe = _remove(composition, upcard)
+        dealer[upcard * DEALER_OUTCOMES:(upcard + 1) * DEALER_OUTCOMES] = array('f', dealer_distribution(upcard, shoe))
+
+        for total in range(4, 22):
+            for soft in (0, 1):
+                if soft and total < 12:
+                    continue
+                hard, ace = (total - 10, True) if soft else (total, False)
+
+                index = StrategyTable._index(total, soft, upcard)
+                values[index] = _stand_ev(total, upcard, shoe)
+                values[index + 1] = _hit_ev(hard, ace, upcard, shoe)
+
+    _dealer.cache_clear()
+    _stand_ev.cache_clear()
+    _hit_ev.cache_clear()
+    return StrategyTable(values, dealer, composition)
+
+
+def cache_path(composition=None, cache_dir=CACHE_DIR):
+    if composition is None:
+        return os.path.join(cache_dir, "infinite.bjs")
+    return os.path.join(cache_dir, "shoe_" + "-".join(str(count) for count in composition) + ".bjs")
+
+
+def load_or_build(composition=None, cache_dir=CACHE_DIR):
+    """Loads the cached table for a composition, computing and caching it on first use."""
+    composition = tuple(composition) if composition is not None else None
+    path = cache_path(composition, cache_dir)
+    try:
+        table = StrategyTable.load(path)
+        if table.composition == composition:
+            return table
+    except (OSError, ValueError):
+        # missing, or damaged by a build older than the atomic save: built again
+        pass
+
+    table = build_table(composition)
+    table.save(path)
+    return table
+
+
+def print_chart(table):
+    upcards = list(range(2, 11)) + [1]
+    print("        " + " ".join(f"{'A' if up == 1 else up:>2}" for up in upcards))
+    for soft in (0, 1):
+        for total in range(21, 11 if soft else 3, -1):
+            actions = " ".join(" H" if table.should_hit(total, soft, up) else " S" for up in upcards)
+            print(f"{'soft' if soft else 'hard'} {total:>2} {actions}")
+
+    print("\ndealer bust probability: " + " ".join(
+        f"{'A' if up == 1 else up}={table.dealer_distribution(up)[BUST]:.3f}" for up in upcards))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and print the hit/stand table")
+    parser.add_argument("--decks", type=int, help="composition dependent table for a full shoe of this many decks")
+    args = parser.parse_args()
+
+    print_chart(load_or_build(shoe_composition(args.decks) if args.decks else None))
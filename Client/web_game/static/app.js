@@ -134,58 +134,103 @@ function endRound(result) {
 }
 
 // =========================================================
-// THE HIGH-SPEED WATCHER (100ms Interval)
+// UPDATE HANDLERS (shared by the event stream and the poller)
 // =========================================================
-setInterval(async () => {
-    try {
-        const res = await fetch("/status");
-        const data = await res.json();
-
-        // 1. Check Connection (Lobby -> Game)
-        // We check !isGameActive to ensure we don't reset the UI unnecessarily
-        if (data.connected && !isGameActive && document.getElementById("setup").style.display !== "none") {
-            console.log("[Watcher] Connection detected! Switching to Game View.");
-            totalRounds = data.rounds;
-            document.getElementById("rounds").value = totalRounds;
-            document.getElementById("setup").style.display = "none";
-            document.getElementById("game").style.display = "block";
-            isGameActive = true;
+function applyConnected(rounds) {
+    // We check !isGameActive to ensure we don't reset the UI unnecessarily
+    if (!isGameActive && document.getElementById("setup").style.display !== "none") {
+        console.log("[Watcher] Connection detected! Switching to Game View.");
+        totalRounds = rounds;
+        document.getElementById("rounds").value = totalRounds;
+        document.getElementById("setup").style.display = "none";
+        document.getElementById("game").style.display = "block";
+        isGameActive = true;
+    }
+}
+
+function applyUpdate(update, data) {
+    if (update === "start") {
+        setTimeout(() => {
+            toggleGameplayButtons(false);
+            renderStartRound(data);
+        }, 3000);
+    }
+    else if (update === "hit") {
+        renderHit(data);
+
+        // CHECK RESULT: If result is not 0 (0 = Continue), round is over
+        if (data.result !== 0) {
+            toggleGameplayButtons(true); // Disable
         }
+    }
+    else if (update === "stand") {
+        renderStand(data);
 
-        // 2. Check for Updates (Start / Hit / Stand)
-        // This handles inputs from BOTH Terminal and Web clicks
-        if (data.update !== "none" ) {
+        // Stand always ends the round (Dealer plays out), so disable immediately
+        toggleGameplayButtons(true);
+    }
+}
 
-           if (data.update === "start") {
-                setTimeout(() => {
-                    toggleGameplayButtons(false);
-                    renderStartRound(data.data);
-                }, 3000);
+function applyWinRate(winRate) {
+    if (winRate >= 0) {
+        console.log(winRate)
+        document.getElementById("win-rate").innerText = `${winRate}%`
+    }
+}
 
-            }
-            else if (data.update === "hit") {
-                renderHit(data.data);
+// =========================================================
+// EVENT STREAM (Server-Sent Events)
+// Every card and result arrives in order, as soon as it happens.
+// =========================================================
+function startEventStream() {
+    const events = new EventSource("/events");
+
+    events.addEventListener("connected", e => applyConnected(JSON.parse(e.data).rounds));
+    ["start", "hit", "stand"].forEach(update =>
+        events.addEventListener(update, e => applyUpdate(update, JSON.parse(e.data))));
+    events.addEventListener("win_rate", e => applyWinRate(JSON.parse(e.data).win_rate));
+
+    events.onerror = () => {
+        // EventSource retries by itself; CLOSED means the stream is not available at all
+        if (events.readyState === EventSource.CLOSED) {
+            console.log("[Watcher] Event stream unavailable, falling back to polling.");
+            startPolling();
+        }
+    };
+}
 
-                // CHECK RESULT: If result is not 0 (0 = Continue), round is over
-                if (data.data.result !== 0) {
-                    toggleGameplayButtons(true); // Disable
-                }
+// =========================================================
+// FALLBACK: THE HIGH-SPEED WATCHER (100ms Interval)
+// =========================================================
+function startPolling() {
+    setInterval(async () => {
+        try {
+            const res = await fetch("/status");
+            const data = await res.json();
+
+            // 1. Check Connection (Lobby -> Game)
+            if (data.connected) {
+                applyConnected(data.rounds);
             }
-            else if (data.update === "stand") {
-                renderStand(data.data);
 
-                // Stand always ends the round (Dealer plays out), so disable immediately
-                toggleGameplayButtons(true);
+            // 2. Check for Updates (Start / Hit / Stand)
+            // This handles inputs from BOTH Terminal and Web clicks
+            if (data.update !== "none") {
+                applyUpdate(data.update, data.data);
             }
 
-        }
+            if (data.win_rate !== undefined) {
+                applyWinRate(data.win_rate);
+            }
 
-        if (data.win_rate >= 0){
-            console.log(data.win_rate)
-            document.getElementById("win-rate").innerText = `${data.win_rate}%`
+        } catch (e) {
+            // Silence errors if server is down (common during restart)
         }
+    }, 100); // <--- 100ms Interval (Very Fast)
+}
 
-    } catch (e) {
-        // Silence errors if server is down (common during restart)
-    }
-}, 100); // <--- 100ms Interval (Very Fast)
\ No newline at end of file
+if (window.EventSource) {
+    startEventStream();
+} else {
+    startPolling();
+}
@@ -1,6 +1,7 @@
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template
 import threading
 import queue
+import json
 
 app = Flask(__name__,
             template_folder='../web_game/templates',
@@ -18,10 +19,60 @@ game_state = {
     "evt_start_ready": threading.Event(),
     "evt_hit_ready": threading.Event(),
     "evt_stand_ready": threading.Event(),
-    "ui_commands": queue.Queue(),
     "win_rate" : -1
 }
 
+# =====================================================
+# EVENT STREAM (Server-Sent Events)
+# =====================================================
+# Every connected /events client gets its own bounded queue. Events are
+# pushed to all of them in order; a client that stops reading is dropped
+# instead of holding up the game.
+EVENT_QUEUE_SIZE = 256
+KEEPALIVE_SECONDS = 15
+
+event_subscribers = []
+event_lock = threading.Lock()
+event_id = 0
+
+# update kind -> (state key, ready event) kept for the /status fallback
+UPDATE_SLOTS = {
+    "start": ("initial_cards", "evt_start_ready"),
+    "hit": ("hit_card", "evt_hit_ready"),
+    "stand": ("stand_cards", "evt_stand_ready"),
+}
+
+
+def publish_event(kind, data):
+    global event_id
+    with event_lock:
+        event_id += 1
+        message = f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+        for subscriber in list(event_subscribers):
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                event_subscribers.remove(subscriber)
+
+
+def push_update(kind, data):
+    """Publishes a start/hit/stand update on the stream and stores it for /status pollers."""
+    state_key, ready_event = UPDATE_SLOTS[kind]
+    game_state[state_key] = data
+    game_state[ready_event].set()
+    publish_event(kind, data)
+
+
+def set_connected(rounds):
+    game_state["rounds"] = rounds
+    game_state["connected"] = True
+    publish_event("connected", {"rounds": rounds})
+
+
+def set_win_rate(win_rate):
+    game_state["win_rate"] = win_rate
+    publish_event("win_rate", {"win_rate": win_rate})
+
 
 @app.route("/")
 def index():
@@ -61,13 +112,42 @@ def check_status():
 
     return jsonify(response)
 
+@app.route("/events", methods=["GET"])
+def events():
+    subscriber = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+    with event_lock:
+        event_subscribers.append(subscriber)
+
+    def stream():
+        try:
+            # sends the headers right away and sets the browser's reconnect delay
+            yield "retry: 1000\n\n"
+
+            # current state first, so a page opened mid-game still switches to the game view
+            if game_state["connected"]:
+                yield f"event: connected\ndata: {json.dumps({'rounds': game_state['rounds']})}\n\n"
+
+            while True:
+                try:
+                    yield subscriber.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    if subscriber not in event_subscribers:
+                        return  # dropped after its queue overflowed
+                    yield ": keepalive\n\n"
+        finally:
+            with event_lock:
+                if subscriber in event_subscribers:
+                    event_subscribers.remove(subscriber)
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 @app.route("/connect", methods=["POST"])
 def initiate_game():
     try:
         data = request.get_json()
         rounds = data.get("rounds", 1)
-        game_state["rounds"] = rounds
-        game_state["connected"] = True
+        set_connected(rounds)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -75,7 +155,7 @@ def initiate_game():
 
 # === Non-Blocking Command Endpoints ===
 # These just tell Client.py to do something. They don't wait for the result.
-# The result will be picked up by the /status poller above.
+# The result is pushed on /events (or picked up by the /status poller above).
 
 @app.route("/start", methods=["POST"])
 def start_cmd():
@@ -90,15 +170,14 @@ def shutdown():
     return 'Server shutting down...'
 
 
+# Client.py replaces these two with handlers that feed its input queue
 @app.route("/hit", methods=["POST"])
 def hit_cmd():
-    game_state["ui_commands"].put("Hit")
     return jsonify({"status": "command_sent"})
 
 
 @app.route("/stand", methods=["POST"])
 def stand_cmd():
-    game_state["ui_commands"].put("Stand")
     return jsonify({"status": "command_sent"})
 
 
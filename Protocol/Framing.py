@@ -0,0 +1,181 @@
+import asyncio
+import struct
+
+# text decisions sent by the client, there is no delimiter between them
+DECISIONS = (b"Hit", b"Stand")
+WHITESPACE = b" \t\r\n"
+# every binary message starts with the magic cookie and the message type
+HEADER_STRUCT = struct.Struct('!IB')
+
+
+class FrameBuffer:
+    """
+    Reusable receive buffer shared by the server and the client.
+    Bytes are received straight into it (recv_into) and complete messages are
+    parsed in place, so pipelined messages stay queued for the next read
+    instead of being merged or dropped.
+    """
+
+    def __init__(self, capacity=4096):
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+    def pending(self):
+        return self.end - self.start
+
+    def writable(self):
+        """Returns the free tail of the buffer, moving unread bytes to the front first."""
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end == len(self.buffer):
+            size = self.end - self.start
+            self.buffer[:size] = bytes(self.view[self.start:self.end])
+            self.start, self.end = 0, size
+        return self.view[self.end:]
+
+    def advance(self, size):
+        """Marks size bytes written into writable() as received."""
+        self.end += size
+
+    def next_struct(self, message_struct):
+        """Unpacks the next fixed-size message, or returns None if it is not complete yet."""
+        if self.end - self.start < message_struct.size:
+            return None
+
+        values = message_struct.unpack_from(self.buffer, self.start)
+        self.start += message_struct.size
+        return values
+
+    def peek_type(self):
+        """Type of the next binary message without consuming it, or None if the header is not complete."""
+        if self.end - self.start < HEADER_STRUCT.size:
+            return None
+        return HEADER_STRUCT.unpack_from(self.buffer, self.start)[1]
+
+    def next_decision(self):
+        """
+        Returns the next "Hit"/"Stand" token, None if more bytes are needed,
+        or the offending text when the bytes are not a valid decision.
+        """
+        while self.start < self.end and self.buffer[self.start] in WHITESPACE:
+            self.start += 1
+
+        pending = self.view[self.start:self.end]
+        for token in DECISIONS:
+            if pending[:len(token)] == token:
+                self.start += len(token)
+                return token.decode()
+            if len(pending) < len(token) and token.startswith(pending):
+                return None
+
+        # drop everything up to the next possible token so the stream can resync
+        resync = [i for i in (self.buffer.find(b"H", self.start + 1, self.end),
+                              self.buffer.find(b"S", self.start + 1, self.end)) if i != -1]
+        stop = min(resync) if resync else self.end
+        invalid = bytes(self.view[self.start:stop])
+        self.start = stop
+        return invalid.decode(errors="replace").strip()
+
+
+class SocketReader:
+    """Blocking message reader for a connected socket."""
+
+    def __init__(self, sock, capacity=4096):
+        self.sock = sock
+        self.frames = FrameBuffer(capacity)
+
+    def _fill(self):
+        received = self.sock.recv_into(self.frames.writable())
+        self.frames.advance(received)
+        return received
+
+    def read_struct(self, message_struct):
+        """Returns the unpacked message, or None if the peer closed the connection."""
+        while True:
+            values = self.frames.next_struct(message_struct)
+            if values is not None:
+                return values
+            if not self._fill():
+                return None
+
+    def read_decision(self):
+        while True:
+            decision = self.frames.next_decision()
+            if decision is not None:
+                return decision
+            if not self._fill():
+                return None
+
+    def peek_type(self):
+        """Waits for the next message header and returns its type, None if the peer closed the connection."""
+        while True:
+            msg_type = self.frames.peek_type()
+            if msg_type is not None:
+                return msg_type
+            if not self._fill():
+                return None
+
+
+class AsyncSocketReader(SocketReader):
+    """Same as SocketReader for a non-blocking socket driven by the asyncio loop."""
+
+    async def _fill(self):
+        loop = asyncio.get_running_loop()
+        received = await loop.sock_recv_into(self.sock, self.frames.writable())
+        self.frames.advance(received)
+        return received
+
+    async def read_struct(self, message_struct):
+        while True:
+            values = self.frames.next_struct(message_struct)
+            if values is not None:
+                return values
+            if not await self._fill():
+                return None
+
+    async def read_decision(self):
+        while True:
+            decision = self.frames.next_decision()
+            if decision is not None:
+                return decision
+            if not await self._fill():
+                return None
+
+    async def peek_type(self):
+        while True:
+            msg_type = self.frames.peek_type()
+            if msg_type is not None:
+                return msg_type
+            if not await self._fill():
+                return None
+
+
+class FrameWriter:
+    """
+    Packs a batch of messages into one reusable buffer, so everything the
+    server says in one turn goes out with a single write.
+    """
+
+    def __init__(self, capacity=256):
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.size = 0
+
+    def add(self, message_struct, *values):
+        end = self.size + message_struct.size
+        if end > len(self.buffer):
+            grown = bytearray(max(end, 2 * len(self.buffer)))
+            grown[:self.size] = self.view[:self.size]
+            self.buffer = grown
+            self.view = memoryview(grown)
+
+        message_struct.pack_into(self.buffer, self.size, *values)
+        self.size = end
+
+    def flush(self):
+        """Returns the packed batch and starts a new one; the view is valid until the next add."""
+        batch = self.view[:self.size]
+        self.size = 0
+        return batch
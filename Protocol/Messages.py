@@ -0,0 +1,63 @@
+import json
+import os
+import struct
+
+# config.json sits in the repository root, independent of the working directory
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+with open(CONFIG_PATH, "r") as f:
+    config_params = json.load(f)
+
+MAGIC_COOKIE = int(config_params["magic_cookie"], 16)
+MSG_TYPE_OFFER = int(config_params["msg_type_offer"], 16)
+MSG_TYPE_REQUEST = int(config_params["msg_type_request"], 16)
+MSG_TYPE_PAYLOAD = int(config_params["msg_type_payload"], 16)
+MSG_TYPE_BUSY = int(config_params["msg_type_busy"], 16)
+MSG_TYPE_BULK_REQUEST = int(config_params["msg_type_bulk_request"], 16)
+MSG_TYPE_BULK_DECISION = int(config_params["msg_type_bulk_decision"], 16)
+MSG_TYPE_BULK_PAYLOAD = int(config_params["msg_type_bulk_payload"], 16)
+MSG_TYPE_DECISION = int(config_params["msg_type_decision"], 16)
+MSG_TYPE_BINARY_REQUEST = int(config_params["msg_type_binary_request"], 16)
+MSG_TYPE_PING = int(config_params["msg_type_ping"], 16)
+MSG_TYPE_PONG = int(config_params["msg_type_pong"], 16)
+
+OFFER_PORT = 13122
+
+# cookie, type, server tcp port, server name
+OFFER_STRUCT = struct.Struct('! I B H 32s')
+# optional tail of an offer: active sessions, session capacity, average round latency in ms,
+# only sent by servers started with --advertise-load. Clients that receive into an
+# OFFER_STRUCT.size buffer (an error on Windows) or unpack the whole datagram cannot read such offers.
+OFFER_LOAD_STRUCT = struct.Struct('!HHH')
+# optional last byte of an offer, after the load if there is one: FEATURE_* flags,
+# only sent by servers started with --advertise-features.
+# The tail's length tells them apart: 1 = features, 6 = load, 7 = load and features.
+OFFER_FEATURES_STRUCT = struct.Struct('!B')
+FEATURE_BINARY_DECISIONS = 0x01  # accepts MSG_TYPE_BINARY_REQUEST
+# cookie, type, token. A MSG_TYPE_PING sent to the address an offer came from is answered
+# with a MSG_TYPE_PONG carrying the same token; older servers do not answer.
+PING_STRUCT = struct.Struct('!IBQ')
+# cookie, type, number of rounds, client name.
+# Type MSG_TYPE_REQUEST: decisions are sent as "Hit"/"Stand" text;
+# type MSG_TYPE_BINARY_REQUEST: decisions are sent as DECISION_STRUCT messages.
+REQUEST_STRUCT = struct.Struct('! I B B 32s')
+# cookie, type, round result, card rank, card shape
+PAYLOAD_STRUCT = struct.Struct('!IBBHB')
+# cookie, type, action (ACTION_STAND or ACTION_HIT)
+DECISION_STRUCT = struct.Struct('!IBB')
+ACTION_STAND = 0
+ACTION_HIT = 1
+# cookie, type, suggested retry delay in ms; sent instead of the first payload when no seat is free
+BUSY_STRUCT = struct.Struct('!IBH')
+
+# Bulk protocol: one connection plays up to MAX_SEATS seats at one table.
+# cookie, type, number of rounds, number of seats, client name
+BULK_REQUEST_STRUCT = struct.Struct('!IBBB32s')
+# cookie, type, bitmask of the waiting seats, bit i set = seat i hits, clear = stands
+BULK_DECISION_STRUCT = struct.Struct('!IBI')
+# cookie, type, number of BULK_CARD_STRUCT entries following
+BULK_PAYLOAD_STRUCT = struct.Struct('!IBH')
+# seat (DEALER_SEAT for the dealer), round result, card rank, card shape; rank 0 carries only a result
+BULK_CARD_STRUCT = struct.Struct('!BBBB')
+MAX_SEATS = 32
+DEALER_SEAT = 0xff
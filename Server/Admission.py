@@ -0,0 +1,67 @@
+import collections
+import threading
+import time
+
+# why a connection was turned away with a busy message
+QUEUE_FULL = "queue_full"  # the waiting room was already full
+WAIT_TIMEOUT = "wait_timeout"  # no seat freed up within max_wait
+
+
+class Admission:
+    """
+    How many connections may wait for a seat (backlog), for how long
+    (max_wait seconds, None for no limit), and the retry delay suggested to
+    the ones turned away.
+    """
+
+    def __init__(self, backlog=64, max_wait=5.0, retry_after=1.0):
+        self.backlog = backlog
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+
+    def retry_after_ms(self):
+        return min(int(self.retry_after * 1000), 0xffff)
+
+
+class AdmissionQueue:
+    """
+    Bounded FIFO of connections waiting for one of the seat threads.
+    offer() fails at once when the queue is full; expire() removes the
+    entries that waited longer than max_wait, oldest first.
+    """
+
+    def __init__(self, backlog, max_wait):
+        self.backlog = backlog
+        self.max_wait = max_wait
+        self.items = collections.deque()  # (enqueued at, item)
+        self.ready = threading.Condition()
+
+    def depth(self):
+        return len(self.items)
+
+    def offer(self, item):
+        with self.ready:
+            if len(self.items) >= self.backlog:
+                return False
+            self.items.append((time.monotonic(), item))
+            self.ready.notify()
+            return True
+
+    def take(self):
+        """Blocks until an item is queued; returns (item, seconds it waited)."""
+        with self.ready:
+            while not self.items:
+                self.ready.wait()
+            enqueued, item = self.items.popleft()
+        return item, time.monotonic() - enqueued
+
+    def expire(self):
+        """Returns the items that waited too long, after removing them from the queue."""
+        if self.max_wait is None:
+            return []
+        limit = time.monotonic() - self.max_wait
+        expired = []
+        with self.ready:
+            while self.items and self.items[0][0] < limit:
+                expired.append(self.items.popleft()[1])
+        return expired
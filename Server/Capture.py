@@ -0,0 +1,151 @@
+"""
+Session capture for record/replay.
+
+A capture file starts with a header (shoe decks and penetration) followed by
+records of every session the server played: its request and shoe seed, each
+decision as the client sent it and each payload write, stamped with
+microseconds since the capture started. Sessions write their records through
+an in-memory queue; a writer thread owns the file.
+
+A server started with the capture's seeds deals every replayed session the
+same shoe as the original one. Replay clients name their sessions
+"replay-<id>" after the recorded session ids.
+"""
+import atexit
+import itertools
+import queue
+import struct
+import threading
+import time
+
+MAGIC = b"BJCAP1"
+# magic, decks, penetration
+HEADER_STRUCT = struct.Struct('!6sBf')
+# kind, session id, microseconds since the capture started, data length
+RECORD_STRUCT = struct.Struct('!BIQH')
+SEED_STRUCT = struct.Struct('!Q')
+
+# record kinds
+SESSION = 1  # data: seed, then the request message
+DECISION = 2  # data: the decision message as received
+PAYLOAD = 3  # data: one write to the client
+END = 4  # no data
+
+REPLAY_PREFIX = "replay-"
+
+_STOP = object()
+
+
+class CaptureLog:
+    """Writes the sessions of one server process to a capture file."""
+
+    def __init__(self, path, decks, penetration):
+        self.file = open(path, "wb")
+        self.file.write(HEADER_STRUCT.pack(MAGIC, decks, penetration))
+        self.start = time.perf_counter()
+        self.ids = itertools.count()
+        # unbounded: a capture is only useful if it is complete
+        self.records = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._write_loop, name="capture-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def session(self, seed, request):
+        """Starts recording a session; returns the SessionTap its handler reports to."""
+        tap = SessionTap(self, next(self.ids))
+        tap.add(SESSION, SEED_STRUCT.pack(seed) + request)
+        return tap
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.records.put(_STOP)
+        self.thread.join()
+        self.thread = None
+        self.file.close()
+
+    def _write_loop(self):
+        while True:
+            record = self.records.get()
+            if record is _STOP:
+                break
+            kind, session_id, offset, data = record
+            self.file.write(RECORD_STRUCT.pack(kind, session_id, offset, len(data)))
+            self.file.write(data)
+            # flush when caught up, so a killed server leaves whole records behind
+            if self.records.empty():
+                self.file.flush()
+
+
+class SessionTap:
+    """Records the messages of one session."""
+
+    def __init__(self, log, session_id):
+        self.log = log
+        self.session_id = session_id
+
+    def add(self, kind, data=b""):
+        offset = int((time.perf_counter() - self.log.start) * 1_000_000)
+        self.log.records.put((kind, self.session_id, offset, bytes(data)))
+
+    def decision(self, message):
+        self.add(DECISION, message)
+
+    def payload(self, data):
+        self.add(PAYLOAD, data)
+
+    def end(self):
+        self.add(END)
+
+
+class CapturedSession:
+    def __init__(self, session_id, seed, request, start):
+        self.session_id = session_id
+        self.seed = seed
+        self.request = request
+        self.start = start  # microseconds since the capture started
+        self.events = []  # (kind, microseconds, data) of decisions and payloads
+        self.complete = False
+
+
+def read_capture(path):
+    """Returns (decks, penetration, sessions by id) of a capture file."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, decks, penetration = HEADER_STRUCT.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a capture file")
+
+    sessions = {}
+    position = HEADER_STRUCT.size
+    # a truncated last record (server killed mid-write) is ignored
+    while position + RECORD_STRUCT.size <= len(data):
+        kind, session_id, offset, length = RECORD_STRUCT.unpack_from(data, position)
+        position += RECORD_STRUCT.size
+        if position + length > len(data):
+            break
+        body = data[position:position + length]
+        position += length
+
+        if kind == SESSION:
+            seed, = SEED_STRUCT.unpack_from(body)
+            sessions[session_id] = CapturedSession(session_id, seed, body[SEED_STRUCT.size:], offset)
+        elif kind == END:
+            sessions[session_id].complete = True
+        else:
+            sessions[session_id].events.append((kind, offset, body))
+
+    return decks, round(penetration, 4), sessions
+
+
+class ReplaySeeds:
+    """The shoe seeds of a capture, handed to the replayed sessions by name."""
+
+    def __init__(self, path):
+        self.decks, self.penetration, sessions = read_capture(path)
+        self.seeds = {REPLAY_PREFIX + str(session_id): session.seed for session_id, session in sessions.items()}
+
+    def seed_for(self, name):
+        """The recorded seed of a replayed session, or None for any other client."""
+        return self.seeds.get(name)
@@ -0,0 +1,53 @@
+import multiprocessing
+import threading
+
+# counter fields, one row of these per worker process
+ACTIVE_SESSIONS = 0
+SESSIONS = 1
+ROUNDS = 2
+ROUND_US = 3  # microseconds the server spent on its turns, summed over the rounds
+FIELDS = 4
+
+
+class WorkerCounters:
+    """
+    Session counters kept in shared memory, one row per worker process.
+    Workers only write their own row, so no lock is shared between processes;
+    the parent reads all of them.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.worker = 0
+        self.values = multiprocessing.Array('q', workers * FIELDS, lock=False)
+        # between the session threads of one worker only
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # a spawned worker gets its own lock
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def add(self, field, amount=1):
+        with self.lock:
+            self.values[self.worker * FIELDS + field] += amount
+
+    def snapshot(self):
+        """
+        Returns a list with one [active, sessions, rounds, round_us] row per worker.
+        Read without stopping the workers, so fields of a row may be one update apart.
+        """
+        flat = self.values[:]
+        return [flat[i * FIELDS:(i + 1) * FIELDS] for i in range(self.workers)]
+
+    def total(self, field):
+        return sum(row[field] for row in self.snapshot())
+
+    def totals(self):
+        """Every field summed over the workers."""
+        return [sum(column) for column in zip(*self.snapshot())]
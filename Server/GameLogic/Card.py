@@ -2,20 +2,40 @@ Shape = ["Heart", "Diamond", "Club", "Spade"]
 
 
 class Card:
-    def __init__(self, rank, shape):
+    """
+    Immutable playing card. There are only 52 of them: Card(rank, shape)
+    returns the shared instance from CARDS instead of allocating a new one.
+    """
+
+    __slots__ = ("rank", "shape", "points", "hard_points")
+
+    def __new__(cls, rank, shape):
         if not (1 <= rank <= 13):
             raise ValueError("Invalid rank")
         if not (0 <= shape <= 3):
             raise ValueError("Invalid suit")
-        self.rank = rank
-        self.shape = shape
+        return CARDS[shape * 13 + rank - 1]
+
+    @classmethod
+    def _create(cls, rank, shape):
+        card = object.__new__(cls)
+        object.__setattr__(card, "rank", rank)
+        object.__setattr__(card, "shape", shape)
+        # blackjack value, precomputed once
+        object.__setattr__(card, "points", 11 if rank == 1 else min(rank, 10))
+        # value with an ace counted as 1, used for the running hand totals
+        object.__setattr__(card, "hard_points", min(rank, 10))
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        # unpickling goes through __new__, so it lands on the shared instance
+        return Card, (self.rank, self.shape)
 
     def value(self):
-        if self.rank == 1:
-            return 11
-        if self.rank >= 10:
-            return 10
-        return self.rank
+        return self.points
 
     def __str__(self):
         if self.rank == 1:
@@ -30,3 +50,7 @@ class Card:
             rank_str = str(self.rank)
 
         return f"{rank_str} of {Shape[self.shape]}"
+
+
+# the 52 cards, ordered by shape then rank
+CARDS = tuple(Card._create(rank, shape) for shape in range(4) for rank in range(1, 14))
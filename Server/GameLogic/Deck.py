@@ -1,16 +1,22 @@
 import random
-from .Card import Card
+from .Card import CARDS
 
 
 class Deck:
-    def __init__(self):
-        self.cards = []
-        for shape in range(4):
-            for rank in range(1, 14):
-                self.cards.append(Card(rank, shape))
-        random.shuffle(self.cards)
+    def __init__(self, rng=None):
+        # any object with shuffle(), e.g. random.Random(seed) for reproducible deals
+        self.rng = rng if rng is not None else random
+        # the list is reused by shuffle(), drawing only moves a cursor
+        self.cards = list(CARDS)
+        self.shuffle()
+
+    def shuffle(self):
+        """Puts every card back in the deck and shuffles it in place."""
+        self.rng.shuffle(self.cards)
+        self.remaining = len(self.cards)
 
     def draw(self):
-        if len(self.cards) == 0:
+        if self.remaining == 0:
             raise RuntimeError("Deck is empty")
-        return self.cards.pop()
+        self.remaining -= 1
+        return self.cards[self.remaining]
@@ -3,13 +3,26 @@ from .Hand import Hand
 
 
 class Game:
-    def __init__(self):
-        self.deck = Deck()
+    def __init__(self, shoe=None, rng=None):
+        # an injected shoe persists across rounds, otherwise every round gets a fresh deck
+        self.shoe = shoe
+        self.deck = shoe if shoe is not None else Deck(rng)
         self.player_hand = Hand()
         self.dealer_hand = Hand()
         self.finished = False
 
+    def reset(self):
+        """Prepares the same objects for a new round."""
+        if self.shoe is None:
+            self.deck.shuffle()
+        self.player_hand.clear()
+        self.dealer_hand.clear()
+        self.finished = False
+
     def start(self):
+        if self.shoe is not None:
+            self.shoe.shuffle_if_due()
+
         # initial deal
         self.player_hand.add_card(self.deck.draw())
         self.dealer_hand.add_card(self.deck.draw())
@@ -26,6 +39,7 @@ class Game:
         return card
 
     def player_stand(self):
+        # dealer stands on every 17, soft 17 included
         while self.dealer_hand.total() < 17:
             self.dealer_hand.add_card(self.deck.draw())
 
@@ -37,8 +51,10 @@ class Game:
         if self.dealer_hand.is_bust():
             return "win"
 
-        if self.player_hand.total() > self.dealer_hand.total():
+        player_total = self.player_hand.total()
+        dealer_total = self.dealer_hand.total()
+        if player_total > dealer_total:
             return "win"
-        if self.player_hand.total() < self.dealer_hand.total():
+        if player_total < dealer_total:
             return "loss"
         return "tie"
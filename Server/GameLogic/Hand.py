@@ -1,21 +1,35 @@
 class Hand:
     def __init__(self):
         self.cards = []
+        # running totals, updated on every card so total() never loops
+        self.hard_total = 0  # aces counted as 1
+        self.aces = 0
 
     def add_card(self, card):
         self.cards.append(card)
+        self.hard_total += card.hard_points
+        if card.rank == 1:
+            self.aces += 1
+
+    def clear(self):
+        self.cards.clear()
+        self.hard_total = 0
+        self.aces = 0
+
+    def is_soft(self):
+        # one ace can count as 11 as long as that does not bust the hand
+        return self.aces > 0 and self.hard_total <= 11
 
     def total(self):
-        total = 0
-        for card in self.cards:
-            total += card.value()
-        return total
+        if self.is_soft():
+            return self.hard_total + 10
+        return self.hard_total
 
     def is_bust(self):
-        return self.total() > 21
+        return self.hard_total > 21
 
     def __str__(self):
         result = []
         for card in self.cards:
             result.append(str(card))
-        return ", ".join(result)
\ No newline at end of file
+        return ", ".join(result)
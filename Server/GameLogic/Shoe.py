@@ -0,0 +1,62 @@
+import random
+from .Card import CARDS
+
+
+class Shoe:
+    """
+    Several decks shuffled together and dealt across the rounds of a session,
+    the way a casino table runs. Drawing moves a cursor over one preallocated
+    list; it is reshuffled between rounds, once the cut card is reached or too
+    few cards are left for the next round.
+    """
+
+    def __init__(self, decks=6, penetration=0.75, rng=None):
+        if not (1 <= decks <= 8):
+            raise ValueError("Invalid number of decks")
+        if not (0 < penetration <= 1):
+            raise ValueError("Invalid penetration")
+
+        self.decks = decks
+        self.rng = rng if rng is not None else random
+        self.cards = list(CARDS) * decks
+        # position of the cut card
+        self.cut = int(len(self.cards) * penetration)
+        self.shuffle()
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.round_start = 0  # cards before it are discards, the ones after it are on the table
+
+    def shuffle_if_due(self, reserve=0):
+        """
+        Called before a round: reshuffles once the cut card has come out, or
+        when fewer than reserve cards are left for the round.
+        """
+        if self.position >= self.cut or self.remaining() < reserve:
+            self.shuffle()
+        self.round_start = self.position
+
+    def remaining(self):
+        return len(self.cards) - self.position
+
+    def draw(self):
+        if self.position == len(self.cards):
+            self._shuffle_discards()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+    def _shuffle_discards(self):
+        """
+        Out of cards mid-round: shuffles the discards of the earlier rounds back
+        in behind the cards on the table, which stay out of the shoe.
+        """
+        discards = self.cards[:self.round_start]
+        if not discards:
+            raise RuntimeError("Shoe is empty")
+        self.rng.shuffle(discards)
+        on_table = self.cards[self.round_start:]
+        self.cards[:] = on_table + discards
+        self.position = len(on_table)
+        self.round_start = 0
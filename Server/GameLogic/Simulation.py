@@ -0,0 +1,211 @@
+"""
+Vectorized Monte-Carlo engine for the server's blackjack rules.
+
+Plays whole batches of rounds at once with NumPy: every row of a batch is one
+round dealt from its own freshly shuffled deck, in the same order as
+Game.start, then the player policy and the dealer rule (hit below 17) run as
+masked loops over the rows that are still drawing. Outcomes follow
+Game.result and pay even money.
+
+Needs numpy. From the Server directory:
+
+    python -m GameLogic.Simulation --rounds 1000000 --policy basic
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from .Card import CARDS
+from .Game import Game
+
+# card values by index into CARDS, aces counted as 1
+HARD_POINTS = np.array([card.hard_points for card in CARDS], dtype=np.int8)
+
+# cards in one batch's shoe matrix; caps a batch's memory whatever the number of decks
+MAX_BATCH_CARDS = 52 * 100_000
+
+# a policy is a boolean table hit[total, soft, dealer up-card], up-card 1 (ace) .. 10
+POLICY_SHAPE = (22, 2, 11)
+
+
+def policy_table(decide):
+    """Builds a policy table from decide(total, soft, upcard) -> True to hit."""
+    table = np.zeros(POLICY_SHAPE, dtype=bool)
+    for total in range(4, 22):
+        for soft in (0, 1):
+            for upcard in range(1, 11):
+                table[total, soft, upcard] = decide(total, bool(soft), upcard)
+    return table
+
+
+def hit_below(threshold):
+    return policy_table(lambda total, soft, upcard: total < threshold)
+
+
+def basic_strategy(total, soft, upcard):
+    """Hit/stand basic strategy for a dealer standing on all 17s, no doubling or splitting."""
+    if soft:
+        return total <= 17 or (total == 18 and upcard in (1, 9, 10))
+    if total <= 11:
+        return True
+    if total == 12:
+        return upcard not in (4, 5, 6)
+    if total <= 16:
+        return upcard == 1 or upcard >= 7
+    return False
+
+
+POLICIES = {
+    "basic": lambda: policy_table(basic_strategy),
+    "dealer": lambda: hit_below(17),
+    "never-bust": lambda: hit_below(12),
+    "stand": lambda: hit_below(0),
+}
+
+
+def _totals(hard, aces):
+    soft = (aces > 0) & (hard <= 11)
+    return np.where(soft, hard + 10, hard), soft
+
+
+def play_batch(size, policy, rng, decks=1):
+    """Plays size rounds and returns their outcomes: 1 win, 0 tie, -1 loss."""
+    rows = np.arange(size)
+    shoes = rng.permuted(np.tile(np.arange(52, dtype=np.int8), (size, decks)), axis=1)
+    points = HARD_POINTS[shoes].astype(np.int16)
+
+    # initial deal, same order as Game.start: player, dealer, player, dealer
+    player_hard = points[:, 0] + points[:, 2]
+    player_aces = (points[:, 0] == 1).astype(np.int8) + (points[:, 2] == 1)
+    dealer_hard = points[:, 1] + points[:, 3]
+    dealer_aces = (points[:, 1] == 1).astype(np.int8) + (points[:, 3] == 1)
+    upcard = points[:, 1]
+    cursor = np.full(size, 4)
+
+    # player draws while the policy says hit and the hand is not bust
+    drawing = np.ones(size, dtype=bool)
+    while drawing.any():
+        total, soft = _totals(player_hard, player_aces)
+        drawing &= policy[np.minimum(total, 21), soft.astype(np.int8), upcard] & (player_hard <= 21)
+        card = points[rows, cursor] * drawing
+        player_hard += card
+        player_aces += card == 1
+        cursor += drawing
+        drawing &= player_hard <= 21
+
+    player_bust = player_hard > 21
+    player_total, _ = _totals(player_hard, player_aces)
+
+    # dealer only plays out the rounds the player has not lost already
+    drawing = ~player_bust
+    while drawing.any():
+        total, _ = _totals(dealer_hard, dealer_aces)
+        drawing &= total < 17
+        card = points[rows, cursor] * drawing
+        dealer_hard += card
+        dealer_aces += card == 1
+        cursor += drawing
+
+    dealer_total, _ = _totals(dealer_hard, dealer_aces)
+    dealer_bust = dealer_hard > 21
+
+    outcome = np.sign(player_total - dealer_total).astype(np.int8)
+    outcome[dealer_bust] = 1
+    outcome[player_bust] = -1
+    return outcome
+
+
+def simulate(rounds, policy, rng=None, decks=1, batch_size=100_000):
+    """Returns win/tie/loss counts and rates plus the EV per round for a policy table."""
+    rng = rng if rng is not None else np.random.default_rng()
+    # every row holds a whole shoe, so the more decks the fewer rows fit in MAX_BATCH_CARDS
+    batch_size = max(1, min(batch_size, MAX_BATCH_CARDS // (52 * decks)))
+    wins = ties = losses = 0
+
+    played = 0
+    while played < rounds:
+        outcome = play_batch(min(batch_size, rounds - played), policy, rng, decks)
+        wins += int(np.count_nonzero(outcome == 1))
+        ties += int(np.count_nonzero(outcome == 0))
+        losses += int(np.count_nonzero(outcome == -1))
+        played += len(outcome)
+
+    return summarize(wins, ties, losses)
+
+
+def summarize(wins, ties, losses):
+    rounds = wins + ties + losses
+    return {
+        "rounds": rounds,
+        "wins": wins,
+        "ties": ties,
+        "losses": losses,
+        "win_rate": wins / rounds,
+        "tie_rate": ties / rounds,
+        "loss_rate": losses / rounds,
+        "ev": (wins - losses) / rounds,
+    }
+
+
+def simulate_scalar(rounds, policy, rng=None):
+    """Same rules through the object based Game, used to cross-check the vectorized engine."""
+    wins = ties = losses = 0
+    for _ in range(rounds):
+        game = Game(rng=rng)
+        game.start()
+        upcard = game.dealer_hand.cards[0].hard_points
+
+        while not game.player_hand.is_bust():
+            hand = game.player_hand
+            if not policy[hand.total(), int(hand.is_soft()), upcard]:
+                break
+            game.player_hit()
+
+        if not game.player_hand.is_bust():
+            game.player_stand()
+
+        result = game.result()
+        if result == "win":
+            wins += 1
+        elif result == "tie":
+            ties += 1
+        else:
+            losses += 1
+
+    return summarize(wins, ties, losses)
+
+
+def cross_check(vector, scalar):
+    """Largest two-proportion z-score between the two engines' win/tie/loss rates."""
+    worst = 0.0
+    for rate in ("win_rate", "tie_rate", "loss_rate"):
+        p1, n1 = vector[rate], vector["rounds"]
+        p2, n2 = scalar[rate], scalar["rounds"]
+        pooled = (p1 * n1 + p2 * n2) / (n1 + n2)
+        error = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+        if error > 0:
+            worst = max(worst, abs(p1 - p2) / error)
+    return worst
+
+
+def print_summary(label, report, elapsed):
+    print(f"{label:>7}: {report['rounds']} rounds in {elapsed:.2f}s ({report['rounds'] / elapsed:,.0f}/s) | "
+          f"win {report['win_rate']:.4f} tie {report['tie_rate']:.4f} loss {report['loss_rate']:.4f} | "
+          f"EV {report['ev']:+.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized blackjack Monte-Carlo simulation")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="basic")
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    policy = POLICIES[args.policy]()
+
+    start = time.perf_counter()
+    report = simulate(args.rounds, policy, np.random.default_rng(args.seed), args.decks)
+    print_summary("numpy", report, time.perf_counter() - start)
@@ -0,0 +1,100 @@
+from .Deck import Deck
+from .Hand import Hand
+
+# cards a round keeps in reserve per hand (dealer included), well above the ~3 a hand takes on average
+CARDS_PER_HAND = 6
+# most points a hand can hold: at most 21 before its last card, which is at most a 10
+MAX_HAND_POINTS = 31
+
+
+def max_seats(cards):
+    """Most seats a shoe or deck of this many cards can deal a round to."""
+    return cards // CARDS_PER_HAND - 1
+
+
+class Table:
+    """
+    Several seats playing against one dealer, all drawing from the same deck
+    or shoe. Same rules as Game: each seat hits until it stands or busts, then
+    the dealer draws to 17 unless every seat is bust.
+    """
+
+    def __init__(self, seats, shoe=None, rng=None):
+        if seats < 1:
+            raise ValueError("A table needs at least one seat")
+
+        self.shoe = shoe
+        self.deck = shoe if shoe is not None else Deck(rng)
+        if seats > max_seats(len(self.deck.cards)):
+            raise ValueError(f"{len(self.deck.cards)} cards cannot deal {seats} seats")
+        # A round only runs out of cards if every card of the shoe is on the table. Hands hold
+        # MAX_HAND_POINTS at most, so with fewer points on a full table than in the shoe no
+        # order of the cards can empty it mid-round.
+        if (seats + 1) * MAX_HAND_POINTS >= sum(card.hard_points for card in self.deck.cards):
+            raise ValueError(f"{len(self.deck.cards)} cards can run out in a round of {seats} seats")
+        self.hands = [Hand() for _ in range(seats)]
+        self.dealer_hand = Hand()
+        self.done = [False] * seats  # stood or bust
+
+    def reset(self):
+        if self.shoe is None:
+            self.deck.shuffle()
+        for hand in self.hands:
+            hand.clear()
+        self.dealer_hand.clear()
+        self.done = [False] * len(self.hands)
+
+    def start(self):
+        if self.shoe is not None:
+            # a full table must not run the shoe dry mid-round
+            self.shoe.shuffle_if_due(CARDS_PER_HAND * (len(self.hands) + 1))
+
+        # one card to every seat and the dealer, twice
+        for _ in range(2):
+            for hand in self.hands:
+                hand.add_card(self.deck.draw())
+            self.dealer_hand.add_card(self.deck.draw())
+
+    def waiting_seats(self):
+        """Seats that still have to decide."""
+        return [seat for seat, done in enumerate(self.done) if not done]
+
+    def all_done(self):
+        return all(self.done)
+
+    def hit(self, seat):
+        card = self.deck.draw()
+        hand = self.hands[seat]
+        hand.add_card(card)
+
+        if hand.is_bust():
+            self.done[seat] = True
+
+        return card
+
+    def stand(self, seat):
+        self.done[seat] = True
+
+    def play_dealer(self):
+        """Draws the dealer's cards once every seat is done, unless nobody is left to beat."""
+        if all(hand.is_bust() for hand in self.hands):
+            return
+
+        # dealer stands on every 17, soft 17 included
+        while self.dealer_hand.total() < 17:
+            self.dealer_hand.add_card(self.deck.draw())
+
+    def result(self, seat):
+        hand = self.hands[seat]
+        if hand.is_bust():
+            return "loss"
+        if self.dealer_hand.is_bust():
+            return "win"
+
+        player_total = hand.total()
+        dealer_total = self.dealer_hand.total()
+        if player_total > dealer_total:
+            return "win"
+        if player_total < dealer_total:
+            return "loss"
+        return "tie"
@@ -0,0 +1,42 @@
+"""
+Non-blocking logging for the server.
+
+Sessions only put records on an in-memory queue; a QueueListener thread
+formats and writes them, so a slow terminal or pipe never stalls a round.
+Messages are written as "event key=value ..." so they stay grep-able.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+FORMAT = "%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s"
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+
+def setup_logging(level="INFO", stream=None):
+    """
+    Routes every logger of this process through one queue. Called again in
+    each worker process, since a forked child does not inherit the listener thread.
+    """
+    log_queue = queue.SimpleQueue()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener.start()
+    # flush what is still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
+
+
+def get_logger(name="server"):
+    return logging.getLogger(name)
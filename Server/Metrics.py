@@ -0,0 +1,216 @@
+"""
+In-process metrics registry with a Prometheus text endpoint.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock,
+cheap enough to update on every round. The registry renders the text
+exposition format and can serve it on a local /metrics endpoint:
+
+    curl http://127.0.0.1:9100/metrics
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds, dense below a millisecond where the server's own turns are
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Value:
+    def __init__(self, lock):
+        self.lock = lock
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+
+class _HistogramValue:
+    def __init__(self, lock, buckets):
+        self.lock = lock
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Metric:
+    """A named metric; with labelnames, every label combination is its own series."""
+
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.series = {}
+        if not self.labelnames:
+            self.series[()] = self._new_value()
+
+    def _new_value(self):
+        return _Value(self.lock)
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        series = self.series.get(values)
+        if series is None:
+            with self.lock:
+                series = self.series.setdefault(values, self._new_value())
+        return series
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for values, series in sorted(self.series.items()):
+                lines.append(f"{self.name}{self._label_text(values)} {series.value}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1):
+        self.series[()].inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1):
+        self.series[()].inc(amount)
+
+    def dec(self, amount=1):
+        self.series[()].dec(amount)
+
+    def set(self, value):
+        self.series[()].set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_value(self):
+        return _HistogramValue(self.lock, self.buckets)
+
+    def observe(self, value):
+        self.series[()].observe(value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for values, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series.counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{self._label_text(values, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_sum{self._label_text(values)} {series.sum}")
+                lines.append(f"{self.name}_count{self._label_text(values)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1", routes=None):
+        """
+        Serves render() on http://host:port/metrics from a daemon thread.
+        routes maps further paths to functions returning (content type, body).
+        """
+        registry = self
+        pages = {"/metrics": lambda: ("text/plain; version=0.0.4", registry.render())}
+        pages.update(routes or {})
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                page = pages.get(self.path)
+                if page is None:
+                    self.send_error(404)
+                    return
+                content_type, body = page()
+                body = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes are not worth a log line each
+
+        httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
+
+
+class ServerMetrics:
+    """The game server's metrics, all on one registry."""
+
+    def __init__(self, registry=None):
+        self.registry = registry or Registry()
+        r = self.registry
+        self.accepts = r.counter("blackjack_accepts_total", "TCP connections accepted")
+        self.active_sessions = r.gauge("blackjack_active_sessions", "Sessions holding a seat")
+        self.semaphore_wait = r.histogram("blackjack_seat_wait_seconds", "Time a connection waited for a free seat")
+        self.queue_depth = r.gauge("blackjack_admission_queue_depth", "Connections waiting for a free seat")
+        self.rejections = r.counter("blackjack_rejections_total", "Connections turned away with a busy message", ["reason"])
+        self.sessions = r.counter("blackjack_sessions_total", "Sessions started")
+        self.rounds = r.counter("blackjack_rounds_total", "Hands played to the end, every seat of a bulk round counts")
+        self.round_phase = r.histogram("blackjack_round_phase_seconds",
+                                       "Server time per turn, from the decision to the cards sent", ["phase"])
+        self.bytes_sent = r.counter("blackjack_bytes_sent_total", "Payload bytes sent to players")
+        self.disconnects = r.counter("blackjack_disconnects_total", "Sessions that ended before their last round", ["reason"])
+        self.evictions = r.counter("blackjack_evictions_total", "Sessions closed by the server for timing out", ["reason"])
+        self.stats_dropped = r.counter("blackjack_stats_dropped_total",
+                                       "Finished hands not stored because the stats queue was full")
+
+        self.deal = self.round_phase.labels("deal")
+
+    def serve(self, port, host="127.0.0.1", routes=None):
+        return self.registry.serve(port, host, routes)
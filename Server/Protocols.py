@@ -0,0 +1,124 @@
+"""
+Wire formats the server speaks, chosen by the type of the client's request.
+
+Each protocol knows its request and decision messages, how to build the
+session for a request and how to pack a turn's entries into one write, so
+the threaded and asyncio servers run the same loop for all of them.
+"""
+from Protocol.Messages import (MAGIC_COOKIE, MSG_TYPE_REQUEST, MSG_TYPE_PAYLOAD, MSG_TYPE_BULK_REQUEST,
+                               MSG_TYPE_BULK_DECISION, MSG_TYPE_BULK_PAYLOAD, MSG_TYPE_DECISION,
+                               MSG_TYPE_BINARY_REQUEST, MAX_SEATS, REQUEST_STRUCT, PAYLOAD_STRUCT, DECISION_STRUCT,
+                               BULK_REQUEST_STRUCT, BULK_DECISION_STRUCT, BULK_PAYLOAD_STRUCT, BULK_CARD_STRUCT)
+from Session import Session, BulkSession
+from GameLogic.Table import max_seats
+
+
+class ProtocolError(Exception):
+    """The client sent something the protocol cannot continue from."""
+
+
+class TextProtocol:
+    """The original protocol: one seat, "Hit"/"Stand" text decisions, one payload per card."""
+
+    request_struct = REQUEST_STRUCT
+    decision_struct = None  # decisions are text, read with read_decision()
+
+    def new_session(self, request, shoe):
+        magic, msg_type, rounds, name = request
+        return Session(rounds, shoe)
+
+    def parse_decision(self, message):
+        return message
+
+    def encode_decision(self, message):
+        """The decision message as the client sent it, for captures."""
+        return message.encode()
+
+    def pack(self, entries, writer):
+        """Packs every (card, result) pair of one server turn into the writer's buffer."""
+        for card, result in entries:
+            writer.add(PAYLOAD_STRUCT, MAGIC_COOKIE, MSG_TYPE_PAYLOAD, result, card.rank, card.shape)
+        return writer.flush()
+
+
+class BinaryProtocol(TextProtocol):
+    """The original protocol with fixed-size binary decisions, chosen by the binary request type."""
+
+    decision_struct = DECISION_STRUCT
+    # indexed by the action byte
+    actions = ("Stand", "Hit")
+
+    def parse_decision(self, message):
+        magic, msg_type, action = message
+        if magic != MAGIC_COOKIE or msg_type != MSG_TYPE_DECISION:
+            raise ProtocolError(f"expected a decision, got type {msg_type:#x}")
+        if action >= len(self.actions):
+            raise ProtocolError(f"unknown action {action}")
+        return self.actions[action]
+
+    def encode_decision(self, message):
+        return self.decision_struct.pack(*message)
+
+
+class BulkProtocol:
+    """Several seats per connection, one bitmask decision and one payload frame per turn."""
+
+    request_struct = BULK_REQUEST_STRUCT
+    decision_struct = BULK_DECISION_STRUCT
+
+    def new_session(self, request, shoe):
+        magic, msg_type, rounds, seats, name = request
+        limit = min(MAX_SEATS, max_seats(len(shoe.cards)))
+        if not 1 <= seats <= limit:
+            raise ProtocolError(f"seats must be 1-{limit}, got {seats}")
+        return BulkSession(rounds, seats, shoe)
+
+    def parse_decision(self, message):
+        magic, msg_type, hit_mask = message
+        if magic != MAGIC_COOKIE or msg_type != MSG_TYPE_BULK_DECISION:
+            raise ProtocolError(f"expected a bulk decision, got type {msg_type:#x}")
+        return hit_mask
+
+    def encode_decision(self, message):
+        return self.decision_struct.pack(*message)
+
+    def pack(self, entries, writer):
+        writer.add(BULK_PAYLOAD_STRUCT, MAGIC_COOKIE, MSG_TYPE_BULK_PAYLOAD, len(entries))
+        for seat, card, result in entries:
+            if card is None:
+                writer.add(BULK_CARD_STRUCT, seat, result, 0, 0)
+            else:
+                writer.add(BULK_CARD_STRUCT, seat, result, card.rank, card.shape)
+        return writer.flush()
+
+
+# request message type -> protocol
+PROTOCOLS = {
+    MSG_TYPE_REQUEST: TextProtocol(),
+    MSG_TYPE_BINARY_REQUEST: BinaryProtocol(),
+    MSG_TYPE_BULK_REQUEST: BulkProtocol(),
+}
+
+
+def _protocol_for(msg_type):
+    protocol = PROTOCOLS.get(msg_type)
+    if protocol is None:
+        raise ProtocolError(f"unknown request type {msg_type:#x}")
+    return protocol
+
+
+def read_request(reader):
+    """Returns (protocol, request), or (None, None) if the client closed before sending one."""
+    msg_type = reader.peek_type()
+    if msg_type is None:
+        return None, None
+    protocol = _protocol_for(msg_type)
+    return protocol, reader.read_struct(protocol.request_struct)
+
+
+async def read_request_async(reader):
+    msg_type = await reader.peek_type()
+    if msg_type is None:
+        return None, None
+    protocol = _protocol_for(msg_type)
+    return protocol, await reader.read_struct(protocol.request_struct)
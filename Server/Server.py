@@ -1,201 +1,686 @@
-import json
 import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from socket import socket
+import os
+import socket
 import struct
-from scapy.all import *
-from scapy.layers.inet import UDP, IP
+import time
 import threading
-from GameLogic.Game import Game
-
-# protocol / payload constants
-ROUND_NOT_OVER = 0x0
-RESULT_TIE = 0x1
-RESULT_LOSS = 0x2
-RESULT_WIN = 0x3
-
-with open("../config.json", "r") as f:
-    config_params = json.load(f)
-
+import asyncio
+import argparse
+import multiprocessing
+import functools
+import errno
+import random
+
+# the shared protocol package lives next to Server/ and Client/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Protocol.Framing import SocketReader, AsyncSocketReader, FrameWriter
+from Protocol.Messages import (MAGIC_COOKIE, MSG_TYPE_OFFER, MSG_TYPE_BUSY, MSG_TYPE_PING, MSG_TYPE_PONG, OFFER_PORT,
+                               OFFER_STRUCT, OFFER_LOAD_STRUCT, OFFER_FEATURES_STRUCT, FEATURE_BINARY_DECISIONS,
+                               REQUEST_STRUCT, BUSY_STRUCT, PING_STRUCT)
+from Protocols import ProtocolError, read_request, read_request_async
+from GameLogic.Shoe import Shoe
+from Counters import WorkerCounters, ACTIVE_SESSIONS, SESSIONS, ROUNDS, ROUND_US
+from Log import setup_logging, get_logger, LEVELS
+from Metrics import ServerMetrics
+from Timeouts import Timeouts, HANDSHAKE, DECISION, WRITE, KEEPALIVE
+from Admission import Admission, AdmissionQueue, QUEUE_FULL, WAIT_TIMEOUT
+from Stats import StatsStore
+from Capture import CaptureLog, ReplaySeeds
+
+log = get_logger()
+
+# load advertising offers: broadcast at once when the load changes, back off while it is steady
+MIN_OFFER_INTERVAL = 0.25
+MAX_OFFER_INTERVAL = 2.0
+# weight of the newest sample in the rolling round latency
+LATENCY_ALPHA = 0.2
 
 def generate_server_name(name):
-    name_to_bytes = name.encode('utf-8')
+    # struct would cut the name at 32 bytes, possibly inside a character
+    name_to_bytes = name.encode('utf-8')[:32].decode('utf-8', 'ignore').encode('utf-8')
     packed_name = struct.pack('32s', name_to_bytes)
     return packed_name
 
 
-def get_offer_msg(server_port, server_name):
-    packet_msg = struct.pack('! I B H 32s',
-                             int(config_params["magic_cookie"], 16),
-                             int(config_params["msg_type_offer"], 16),
-                             server_port,
-                             server_name)
+def get_offer_msg(server_port, server_name, load=None, features=None):
+    packet_msg = OFFER_STRUCT.pack(MAGIC_COOKIE,
+                                   MSG_TYPE_OFFER,
+                                   server_port,
+                                   server_name)
+    if load is not None:
+        # (active sessions, capacity, round latency ms), each capped to 16 bits
+        packet_msg += OFFER_LOAD_STRUCT.pack(*(min(int(value), 0xffff) for value in load))
+    if features is not None:
+        packet_msg += OFFER_FEATURES_STRUCT.pack(features)
     return packet_msg
 
 
-def send_card(magic_cookie, msg_type, card, result, sock):
-    card_packet = struct.pack(
-        '!IBBHB',
-        magic_cookie,
-        msg_type,
-        result,
-        card.rank,
-        card.shape
-    )
-    sock.sendall(card_packet)
-
-def game_result_to_code(result):
-    if result == "win":
-        return RESULT_WIN
-    if result == "loss":
-        return RESULT_LOSS
-    if result == "tie":
-        return RESULT_TIE
-    return ROUND_NOT_OVER
-
-
-def run_server_offer(name, tcp_port):
+def get_busy_msg(retry_after_ms):
+    return BUSY_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_BUSY, retry_after_ms)
+
+
+def close_rejected(client_sock):
+    """Closes a connection after the busy message without resetting it."""
+    try:
+        client_sock.shutdown(socket.SHUT_WR)
+        # closing with the request still unread would send a RST, which can discard the busy message
+        client_sock.setblocking(False)
+        client_sock.recv(REQUEST_STRUCT.size)
+    except OSError:
+        pass
+    client_sock.close()
+
+
+async def with_timeout(awaitable, timeout):
+    if timeout is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout)
+
+
+def answer_pings(udp_sock):
+    """Echoes clients' pings on the offer socket, so they can measure the round trip without taking a seat."""
+    while True:
+        try:
+            data, addr = udp_sock.recvfrom(64)
+        except OSError:
+            # e.g. an ICMP error from an earlier reply on some platforms
+            continue
+        if len(data) != PING_STRUCT.size:
+            continue
+        magic_cookie, msg_type, token = PING_STRUCT.unpack(data)
+        if magic_cookie == MAGIC_COOKIE and msg_type == MSG_TYPE_PING:
+            try:
+                udp_sock.sendto(PING_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_PONG, token), addr)
+            except OSError:
+                pass
+
+
+def run_server_offer(name, tcp_port, counters=None, capacity=0, features=None):
+    """
+    Broadcasts the offer once per second. With counters, the offers carry the
+    current load and are sent as soon as it changes noticeably, backing off to
+    MAX_OFFER_INTERVAL while it stays the same. With features, they end in the
+    FEATURE_* flags.
+    """
     server_name = generate_server_name(name)
-    offer_msg = get_offer_msg(tcp_port, server_name)
+    offer_msg = get_offer_msg(tcp_port, server_name, features=features)
 
     udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    # bound before the first offer, so pings to the offers' source port reach answer_pings
+    udp_sock.bind(('', 0))
+    threading.Thread(target=answer_pings, args=(udp_sock,), daemon=True).start()
 
-    while True:
-        udp_sock.sendto(offer_msg, ('255.255.255.255', 13122))
-        udp_sock.sendto(offer_msg, ('192.168.1.255', 13122))
-        time.sleep(1)
+    def broadcast(msg):
+        udp_sock.sendto(msg, ('255.255.255.255', OFFER_PORT))
+        udp_sock.sendto(msg, ('192.168.1.255', OFFER_PORT))
 
+    if counters is None:
+        while True:
+            broadcast(offer_msg)
+            time.sleep(1)
 
-def run_server_request(socket):
-    player_semaphore = threading.Semaphore(8)
+    interval = MIN_OFFER_INTERVAL
+    last_sent = 0.0
+    last_active = None
+    latency_ms = 0.0
+    totals = counters.totals()
+
+    while True:
+        previous, totals = totals, counters.totals()
+        active = totals[ACTIVE_SESSIONS]
+        rounds = totals[ROUNDS] - previous[ROUNDS]
+        if rounds:
+            sample = (totals[ROUND_US] - previous[ROUND_US]) / rounds / 1000
+            latency_ms += LATENCY_ALPHA * (sample - latency_ms)
+
+        # an eighth of the capacity, or a seat filling up or freeing at capacity, is a change worth announcing
+        changed = (last_active is None
+                   or abs(active - last_active) * 8 >= capacity
+                   or (active >= capacity) != (last_active >= capacity))
+        if changed:
+            interval = MIN_OFFER_INTERVAL
+
+        now = time.monotonic()
+        if changed or now - last_sent >= interval:
+            broadcast(get_offer_msg(tcp_port, server_name, (active, capacity, round(latency_ms)), features))
+            if not changed:
+                interval = min(interval * 2, MAX_OFFER_INTERVAL)
+            last_sent = now
+            last_active = active
+
+        time.sleep(MIN_OFFER_INTERVAL)
+
+
+def start_capture(protocol, request, name, shoe_factory, capture=None, seeds=None):
+    """
+    Returns (shoe, capture tap or None) for a new session. A replayed session
+    gets the shoe seed it was recorded with; captured sessions get a fresh one.
+    """
+    seed = seeds.seed_for(name) if seeds is not None else None
+    if seed is None and capture is not None:
+        seed = random.getrandbits(64)
+    shoe = shoe_factory() if seed is None else shoe_factory(rng=random.Random(seed))
+    tap = capture.session(seed, protocol.request_struct.pack(*request)) if capture is not None else None
+    return shoe, tap
+
+
+def run_server_request(server_sock, max_sessions=8, counters=None, shoe_factory=Shoe, metrics=None, timeouts=None,
+                       admission=None, stats=None, capture=None, seeds=None):
+    """
+    max_sessions seat threads play the sessions; accepted connections wait for
+    one in a bounded admission queue and are told the server is busy when the
+    queue is full or their wait runs out.
+    """
+    counters = counters or WorkerCounters()
+    metrics = metrics or ServerMetrics()
+    timeouts = timeouts or Timeouts()
+    admission = admission or Admission()
+    waiting = AdmissionQueue(admission.backlog, admission.max_wait)
+    busy_msg = get_busy_msg(admission.retry_after_ms())
+
+    def reject(client_sock, client_addr, reason):
+        log.info("session rejected addr=%s:%d reason=%s", *client_addr, reason)
+        metrics.rejections.labels(reason).inc()
+        try:
+            client_sock.sendall(busy_msg)
+        except OSError:
+            pass
+        close_rejected(client_sock)
 
     def handle_client(client_sock, client_addr):
-        print("handle client")
-        player_semaphore.acquire()
-        print("Player joined:", client_addr)
+        log.info("player joined addr=%s:%d", *client_addr)
+        counters.add(ACTIVE_SESSIONS)
+        metrics.active_sessions.inc()
+        deadline = timeouts.start()
 
         try:
-            data = client_sock.recv(1024)
-            if not data:
+            reader = SocketReader(client_sock)
+            writer = FrameWriter()
+            reason = timeouts.apply(client_sock, HANDSHAKE, deadline)
+            # the request type picks the protocol for the whole session
+            protocol, request = read_request(reader)
+            if request is None:
+                metrics.disconnects.labels("closed").inc()
                 return
 
-            magic, msg_type, rounds, name = struct.unpack('! I B B 32s', data)
-            name = name.rstrip(b'\x00').decode()
+            # a name that is not valid UTF-8 must not end the session, let alone the seat
+            name = request[-1].rstrip(b'\x00').decode(errors="replace")
+            shoe, tap = start_capture(protocol, request, name, shoe_factory, capture, seeds)
+            session = protocol.new_session(request, shoe)
 
-            print("Received from client:", magic, msg_type, rounds, name)
+            log.info("session request addr=%s:%d rounds=%d seats=%d name=%s",
+                     *client_addr, session.rounds, session.seats, name)
 
             # start game
-            for r in range(rounds):
-                print(f"Starting round {r + 1}")
-                game = Game()
-                game.start()
-
-                # first payload:
-                send_card(int(config_params["magic_cookie"], 16), int(config_params["msg_type_payload"], 16), game.player_hand.cards[0], ROUND_NOT_OVER, client_sock)
-                send_card(int(config_params["magic_cookie"], 16), int(config_params["msg_type_payload"], 16), game.player_hand.cards[1], ROUND_NOT_OVER, client_sock)
-                send_card(int(config_params["magic_cookie"], 16), int(config_params["msg_type_payload"], 16), game.dealer_hand.cards[0], ROUND_NOT_OVER, client_sock)
+            counters.add(SESSIONS)
+            metrics.sessions.inc()
+            for r in range(session.rounds):
+                log.debug("round start addr=%s:%d round=%d", *client_addr, r + 1)
+                round_start = time.time()
+
+                # first payload: the initial cards in one write
+                reason = timeouts.apply(client_sock, WRITE, deadline)
+                turn_start = time.perf_counter()
+                data = protocol.pack(session.start_round(), writer)
+                client_sock.sendall(data)
+                metrics.bytes_sent.inc(len(data))
+                if tap is not None:
+                    tap.payload(data)
+                busy = time.perf_counter() - turn_start
+                metrics.deal.observe(busy)
 
                 # waiting to client to determine hit/stand
-                while True:
-                    decision = client_sock.recv(1024)
-                    if not decision:
-                        print("Client disconnected during round")
+                while not session.round_over:
+                    reason = timeouts.apply(client_sock, DECISION, deadline)
+                    if protocol.decision_struct is None:
+                        message = reader.read_decision()
+                    else:
+                        message = reader.read_struct(protocol.decision_struct)
+                    if message is None:
+                        log.info("client disconnected during round addr=%s:%d", *client_addr)
+                        metrics.disconnects.labels("closed").inc()
                         return
 
-                    decision = decision.strip().decode()
-                    print("Client decision:", decision)
-
-                    if decision == "Hit":
-                        card = game.player_hit()
-
-                        if game.player_hand.is_bust():
-                            send_card(
-                                int(config_params["magic_cookie"], 16),
-                                int(config_params["msg_type_payload"], 16),
-                                card,
-                                RESULT_LOSS,
-                                client_sock
-                            )
-                            break
-
-                        send_card(
-                            int(config_params["magic_cookie"], 16),
-                            int(config_params["msg_type_payload"], 16),
-                            card,
-                            ROUND_NOT_OVER,
-                            client_sock
-                        )
-
-                    elif decision == "Stand":
-
-                        game.player_stand()
-                        for card in game.dealer_hand.cards[1:-1]:
-                            send_card(
-                                int(config_params["magic_cookie"], 16),
-                                int(config_params["msg_type_payload"], 16),
-                                card,
-                                ROUND_NOT_OVER,
-                                client_sock
-                            )
-
-                        result_str = game.result()
-                        result_code = game_result_to_code(result_str)
-
-                        send_card(
-                            int(config_params["magic_cookie"], 16),
-                            int(config_params["msg_type_payload"], 16),
-                            game.dealer_hand.cards[-1],
-                            result_code,
-                            client_sock
-                        )
-
-                        break
+                    if tap is not None:
+                        tap.decision(protocol.encode_decision(message))
+                    decision = protocol.parse_decision(message)
+                    log.debug("decision addr=%s:%d decision=%s", *client_addr, decision)
+
+                    turn_start = time.perf_counter()
+                    entries = session.apply_decision(decision)
+                    if entries is None:
+                        log.warning("invalid decision addr=%s:%d decision=%r", *client_addr, decision)
+                        continue
+
+                    reason = timeouts.apply(client_sock, WRITE, deadline)
+                    data = protocol.pack(entries, writer)
+                    client_sock.sendall(data)
+                    metrics.bytes_sent.inc(len(data))
+                    if tap is not None:
+                        tap.payload(data)
+                    turn = time.perf_counter() - turn_start
+                    metrics.round_phase.labels(session.phase(decision)).observe(turn)
+                    busy += turn
+
+                counters.add(ROUNDS, session.seats)
+                counters.add(ROUND_US, int(busy * 1_000_000))
+                metrics.rounds.inc(session.seats)
+                if stats is not None and not stats.record_round(name, session, round_start,
+                                                                time.time() - round_start, busy):
+                    metrics.stats_dropped.inc(session.seats)
+
+            if tap is not None:
+                tap.end()
+
+        except ProtocolError as e:
+            log.warning("protocol error addr=%s:%d error=%s", *client_addr, e)
+            metrics.disconnects.labels("protocol").inc()
+
+        except (socket.timeout, TimeoutError) as e:
+            # socket.timeout is only an alias of TimeoutError from Python 3.10.
+            # A plain socket timeout has no errno, failed keepalive probes surface as ETIMEDOUT
+            reason = KEEPALIVE if e.errno == errno.ETIMEDOUT else reason
+            log.info("session evicted addr=%s:%d reason=%s", *client_addr, reason)
+            metrics.evictions.labels(reason).inc()
+
+        except ConnectionError as e:
+            log.info("session aborted addr=%s:%d error=%s", *client_addr, e)
+            metrics.disconnects.labels("error").inc()
+
+        finally:
+            counters.add(ACTIVE_SESSIONS, -1)
+            metrics.active_sessions.dec()
+            client_sock.close()
+            log.info("player left addr=%s:%d", *client_addr)
+
+    def seat():
+        while True:
+            (client_sock, client_addr), waited = waiting.take()
+            metrics.queue_depth.set(waiting.depth())
+            metrics.semaphore_wait.observe(waited)
+            try:
+                handle_client(client_sock, client_addr)
+            except Exception:
+                # a bug in one session must not take its seat thread down with it
+                log.exception("session crashed addr=%s:%d", *client_addr)
+                metrics.disconnects.labels("crash").inc()
+
+    def reap_expired():
+        while True:
+            time.sleep(min(admission.max_wait / 4, 0.25))
+            for client_sock, client_addr in waiting.expire():
+                reject(client_sock, client_addr, WAIT_TIMEOUT)
+            metrics.queue_depth.set(waiting.depth())
+
+    for _ in range(max_sessions):
+        threading.Thread(target=seat, daemon=True).start()
+    # without a wait limit nothing ever expires
+    if admission.max_wait is not None:
+        threading.Thread(target=reap_expired, daemon=True).start()
+
+    # CREATE SERVER SOCKET ONCE
+
+    server_sock.listen()
+
+    log.info("tcp listening port=%d mode=thread max_sessions=%d backlog=%d",
+             server_sock.getsockname()[1], max_sessions, admission.backlog)
+
+    while True:
+        client_sock, client_addr = server_sock.accept()
+        timeouts.configure_socket(client_sock)
+        metrics.accepts.inc()
+        log.debug("client accepted addr=%s:%d", *client_addr)
+
+        if not waiting.offer((client_sock, client_addr)):
+            reject(client_sock, client_addr, QUEUE_FULL)
+        metrics.queue_depth.set(waiting.depth())
+
+
+def run_server_request_async(server_sock, max_sessions=8, counters=None, shoe_factory=Shoe, metrics=None,
+                             timeouts=None, admission=None, stats=None, capture=None, seeds=None):
+    """
+    Same protocol as run_server_request, but every session is a coroutine on a
+    single event loop instead of a thread, so waiting players cost no thread.
+    """
+    counters = counters or WorkerCounters()
+    metrics = metrics or ServerMetrics()
+    timeouts = timeouts or Timeouts()
+    admission = admission or Admission()
+    busy_msg = get_busy_msg(admission.retry_after_ms())
+    waiting = 0
+
+    async def reject(client_sock, client_addr, reason):
+        log.info("session rejected addr=%s:%d reason=%s", *client_addr, reason)
+        metrics.rejections.labels(reason).inc()
+        try:
+            await asyncio.get_running_loop().sock_sendall(client_sock, busy_msg)
+        except OSError:
+            pass
+        close_rejected(client_sock)
+
+    async def handle_client_async(client_sock, client_addr, player_semaphore):
+        nonlocal waiting
+        loop = asyncio.get_running_loop()
+
+        wait_start = time.perf_counter()
+        waiting += 1
+        metrics.queue_depth.set(waiting)
+        try:
+            await with_timeout(player_semaphore.acquire(), admission.max_wait)
+        except (TimeoutError, asyncio.TimeoutError):
+            await reject(client_sock, client_addr, WAIT_TIMEOUT)
+            return
+        finally:
+            waiting -= 1
+            metrics.queue_depth.set(waiting)
+
+        metrics.semaphore_wait.observe(time.perf_counter() - wait_start)
+        log.info("player joined addr=%s:%d", *client_addr)
+        counters.add(ACTIVE_SESSIONS)
+        metrics.active_sessions.inc()
+        deadline = timeouts.start()
+
+        try:
+            reader = AsyncSocketReader(client_sock)
+            writer = FrameWriter()
+            timeout, reason = timeouts.limit(HANDSHAKE, deadline)
+            protocol, request = await with_timeout(read_request_async(reader), timeout)
+            if request is None:
+                metrics.disconnects.labels("closed").inc()
+                return
 
+            # a name that is not valid UTF-8 must not end the session, let alone the seat
+            name = request[-1].rstrip(b'\x00').decode(errors="replace")
+            shoe, tap = start_capture(protocol, request, name, shoe_factory, capture, seeds)
+            session = protocol.new_session(request, shoe)
+
+            log.info("session request addr=%s:%d rounds=%d seats=%d name=%s",
+                     *client_addr, session.rounds, session.seats, name)
+
+            counters.add(SESSIONS)
+            metrics.sessions.inc()
+            for r in range(session.rounds):
+                log.debug("round start addr=%s:%d round=%d", *client_addr, r + 1)
+                round_start = time.time()
+
+                turn_start = time.perf_counter()
+                data = protocol.pack(session.start_round(), writer)
+                timeout, reason = timeouts.limit(WRITE, deadline)
+                await with_timeout(loop.sock_sendall(client_sock, data), timeout)
+                metrics.bytes_sent.inc(len(data))
+                if tap is not None:
+                    tap.payload(data)
+                busy = time.perf_counter() - turn_start
+                metrics.deal.observe(busy)
+
+                while not session.round_over:
+                    timeout, reason = timeouts.limit(DECISION, deadline)
+                    if protocol.decision_struct is None:
+                        message = await with_timeout(reader.read_decision(), timeout)
                     else:
-                        print("Invalid decision received:", decision)
+                        message = await with_timeout(reader.read_struct(protocol.decision_struct), timeout)
+                    if message is None:
+                        log.info("client disconnected during round addr=%s:%d", *client_addr)
+                        metrics.disconnects.labels("closed").inc()
+                        return
+
+                    if tap is not None:
+                        tap.decision(protocol.encode_decision(message))
+                    decision = protocol.parse_decision(message)
+                    log.debug("decision addr=%s:%d decision=%s", *client_addr, decision)
+
+                    turn_start = time.perf_counter()
+                    entries = session.apply_decision(decision)
+                    if entries is None:
+                        log.warning("invalid decision addr=%s:%d decision=%r", *client_addr, decision)
+                        continue
+
+                    data = protocol.pack(entries, writer)
+                    timeout, reason = timeouts.limit(WRITE, deadline)
+                    await with_timeout(loop.sock_sendall(client_sock, data), timeout)
+                    metrics.bytes_sent.inc(len(data))
+                    if tap is not None:
+                        tap.payload(data)
+                    turn = time.perf_counter() - turn_start
+                    metrics.round_phase.labels(session.phase(decision)).observe(turn)
+                    busy += turn
+
+                counters.add(ROUNDS, session.seats)
+                counters.add(ROUND_US, int(busy * 1_000_000))
+                metrics.rounds.inc(session.seats)
+                if stats is not None and not stats.record_round(name, session, round_start,
+                                                                time.time() - round_start, busy):
+                    metrics.stats_dropped.inc(session.seats)
+
+            if tap is not None:
+                tap.end()
+
+        except ProtocolError as e:
+            log.warning("protocol error addr=%s:%d error=%s", *client_addr, e)
+            metrics.disconnects.labels("protocol").inc()
+
+        except (TimeoutError, asyncio.TimeoutError) as e:
+            reason = KEEPALIVE if getattr(e, "errno", None) == errno.ETIMEDOUT else reason
+            log.info("session evicted addr=%s:%d reason=%s", *client_addr, reason)
+            metrics.evictions.labels(reason).inc()
+
+        except ConnectionError as e:
+            log.info("session aborted addr=%s:%d error=%s", *client_addr, e)
+            metrics.disconnects.labels("error").inc()
+
+        except Exception:
+            log.exception("session crashed addr=%s:%d", *client_addr)
+            metrics.disconnects.labels("crash").inc()
 
         finally:
+            counters.add(ACTIVE_SESSIONS, -1)
+            metrics.active_sessions.dec()
             player_semaphore.release()
             client_sock.close()
-            print("Player left:", client_addr)
+            log.info("player left addr=%s:%d", *client_addr)
 
-    # CREATE SERVER SOCKET ONCE
+    async def accept_loop():
+        loop = asyncio.get_running_loop()
+        # created inside the running loop so it binds to it
+        player_semaphore = asyncio.Semaphore(max_sessions)
+        sessions = set()
+
+        server_sock.setblocking(False)
+        server_sock.listen(socket.SOMAXCONN)
+        log.info("tcp listening port=%d mode=async max_sessions=%d backlog=%d",
+                 server_sock.getsockname()[1], max_sessions, admission.backlog)
+
+        while True:
+            client_sock, client_addr = await loop.sock_accept(server_sock)
+            client_sock.setblocking(False)
+            timeouts.configure_socket(client_sock)
+            metrics.accepts.inc()
+            log.debug("client accepted addr=%s:%d", *client_addr)
+
+            if waiting >= admission.backlog:
+                await reject(client_sock, client_addr, QUEUE_FULL)
+                continue
+
+            # keep a reference so the task is not garbage collected mid-session
+            task = loop.create_task(handle_client_async(client_sock, client_addr, player_semaphore))
+            sessions.add(task)
+            task.add_done_callback(sessions.discard)
+
+    asyncio.run(accept_loop())
+
+
+def run_worker(index, tcp_port, mode, max_sessions, counters, shoe_factory, listen_sock=None,
+               metrics_port=None, log_level="INFO", timeouts=None, admission=None, stats_db=None, seeds=None):
+    """Entry point of one pre-forked worker process."""
+    counters.worker = index
+    setup_logging(log_level)
+
+    # every worker writes to the shared database file with its own connection
+    stats = StatsStore(stats_db).start() if stats_db else None
+
+    # metrics live in each process; worker i serves them on metrics_port + i
+    metrics = ServerMetrics()
+    if metrics_port is not None:
+        metrics.serve(metrics_port + index, routes=stats_routes(stats))
+
+    if listen_sock is None:
+        # every worker owns a listening socket on the shared port, the kernel spreads connections
+        listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listen_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        listen_sock.bind(('', tcp_port))
+        listen_sock.listen(socket.SOMAXCONN)
+
+    serve = run_server_request_async if mode == "async" else run_server_request
+    serve(listen_sock, max_sessions, counters, shoe_factory, metrics, timeouts, admission, stats, seeds=seeds)
 
-    socket.listen()
 
-    print(f"TCP listening on port {socket.getsockname()[1]}")
+def stats_routes(stats):
+    """Extra pages for the metrics server."""
+    return {"/leaderboard": stats.leaderboard_page} if stats is not None else None
+
+
+def run_counters_report(counters, interval=5):
+    """Logs the aggregated worker counters from the parent process."""
+    last = counters.snapshot()
 
     while True:
-        client_sock, client_addr = socket.accept()
-        print("client accepted ", client_addr)
+        time.sleep(interval)
+        rows = counters.snapshot()
 
-        threading.Thread(
-            target=handle_client,
-            args=(client_sock, client_addr),
+        per_worker = []
+        for i, row in enumerate(rows):
+            rounds_per_sec = (row[ROUNDS] - last[i][ROUNDS]) / interval
+            per_worker.append(f"w{i}: {row[ACTIVE_SESSIONS]} active, {rounds_per_sec:.1f} rounds/s")
+
+        total_rounds = sum(row[ROUNDS] for row in rows) - sum(row[ROUNDS] for row in last)
+        log.info(f"workers active={sum(row[ACTIVE_SESSIONS] for row in rows)} "
+                 f"sessions={sum(row[SESSIONS] for row in rows)} "
+                 f"rounds/s={total_rounds / interval:.1f} | " + " | ".join(per_worker))
+        last = rows
+
+
+def run_prefork(tcp_sock, mode, max_sessions, counters, shoe_factory, metrics_port=None, log_level="INFO",
+                timeouts=None, admission=None, stats_db=None, seeds=None):
+    workers = counters.workers
+    tcp_port = tcp_sock.getsockname()[1]
+
+    # without SO_REUSEPORT the workers share (and accept on) the parent's listening socket
+    shared_sock = None if hasattr(socket, "SO_REUSEPORT") else tcp_sock
+
+    for index in range(workers):
+        multiprocessing.Process(
+            target=run_worker,
+            args=(index, tcp_port, mode, max_sessions, counters, shoe_factory, shared_sock,
+                  metrics_port, log_level, timeouts, admission, stats_db, seeds),
             daemon=True
         ).start()
 
+    threading.Thread(target=run_counters_report, args=(counters,), daemon=True).start()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        raise Exception("Invalid Arguments")
 
-    name = sys.argv[1]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blackjack game server")
+    parser.add_argument("name", help="server name advertised in the offer")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread",
+                        help="thread per connection, or one asyncio event loop for all sessions")
+    parser.add_argument("--max-sessions", type=int, default=8,
+                        help="number of players served at the same time (per worker)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes sharing the TCP port")
+    parser.add_argument("--decks", type=int, default=6, choices=range(1, 9), metavar="1-8",
+                        help="decks in each session's shoe")
+    parser.add_argument("--penetration", type=float, default=0.75,
+                        help="fraction of the shoe dealt before it is reshuffled")
+    parser.add_argument("--advertise-load", action="store_true",
+                        help="append active sessions, capacity and round latency to the offers; "
+                             "clients that only read the 39-byte offer cannot parse them")
+    parser.add_argument("--advertise-features", action="store_true",
+                        help="append the protocol features (binary decisions) to the offers; "
+                             "clients that only read the 39-byte offer cannot parse them")
+    parser.add_argument("--log-level", choices=LEVELS, default="INFO",
+                        help="DEBUG logs every round and decision")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics (PORT + i for worker i)")
+    parser.add_argument("--handshake-timeout", type=float, default=10,
+                        help="seconds a new connection has to send its request (0 disables)")
+    parser.add_argument("--decision-timeout", type=float, default=120,
+                        help="seconds a player has for each Hit/Stand, also the send timeout (0 disables)")
+    parser.add_argument("--session-timeout", type=float, default=3600,
+                        help="seconds a whole session may take (0 disables)")
+    parser.add_argument("--keepalive-idle", type=int, default=30,
+                        help="seconds of silence before TCP keepalive probes start (0 disables keepalive)")
+    parser.add_argument("--backlog", type=int, default=64,
+                        help="connections that may wait for a free seat (per worker), more are told the server is busy")
+    parser.add_argument("--max-wait", type=float, default=5,
+                        help="seconds a connection may wait for a seat before it is told the server is busy "
+                             "(0 waits for as long as it takes)")
+    parser.add_argument("--retry-after", type=float, default=1,
+                        help="retry delay in seconds suggested to rejected clients")
+    parser.add_argument("--stats-db", metavar="PATH",
+                        help="record every finished hand in this SQLite file, leaderboard on the metrics port")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record every session to PATH for Benchmarks/Replay.py (single worker only)")
+    parser.add_argument("--replay-seeds", metavar="CAPTURE",
+                        help="deal replayed sessions the shoes recorded in CAPTURE, also takes its decks and penetration")
+    args = parser.parse_args()
+    if args.capture and args.workers > 1:
+        parser.error("--capture needs a single worker")
+    if args.max_wait < 0:
+        parser.error("--max-wait cannot be negative")
+
+    setup_logging(args.log_level)
+
+    seeds = None
+    if args.replay_seeds:
+        seeds = ReplaySeeds(args.replay_seeds)
+        args.decks, args.penetration = seeds.decks, seeds.penetration
+        log.info("replay seeds sessions=%d decks=%d penetration=%s",
+                 len(seeds.seeds), args.decks, args.penetration)
+
+    timeouts = Timeouts(args.handshake_timeout or None, args.decision_timeout or None,
+                        args.session_timeout or None, args.keepalive_idle)
+    admission = Admission(args.backlog, args.max_wait or None, args.retry_after)
+
+    # every session gets its own shoe, kept across its rounds
+    shoe_factory = functools.partial(Shoe, args.decks, args.penetration)
+
+    name = args.name
 
     tcp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    tcp_sock.bind(('', 0))
-    tcp_sock.listen()
+    if args.workers > 1 and hasattr(socket, "SO_REUSEPORT"):
+        # the parent only reserves the port, the workers listen on it
+        tcp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        tcp_sock.bind(('', 0))
+    else:
+        tcp_sock.bind(('', 0))
+        tcp_sock.listen(socket.SOMAXCONN)
 
     tcp_port = tcp_sock.getsockname()[1]
-    print(f"TCP listening on port {tcp_port}")
-
-    # TCP accept loop
-    threading.Thread(
-        target=run_server_request,
-        args=(tcp_sock,),
-        daemon=True
-    ).start()
+    # on stdout rather than the log: scripts starting the server wait for this line
+    print(f"TCP listening on port {tcp_port}", flush=True)
+
+    counters = WorkerCounters(args.workers)
+    if args.workers > 1:
+        run_prefork(tcp_sock, args.mode, args.max_sessions, counters, shoe_factory,
+                    args.metrics_port, args.log_level, timeouts, admission, args.stats_db, seeds)
+    else:
+        stats = StatsStore(args.stats_db).start() if args.stats_db else None
+        capture = CaptureLog(args.capture, args.decks, args.penetration) if args.capture else None
+        metrics = ServerMetrics()
+        if args.metrics_port is not None:
+            metrics.serve(args.metrics_port, routes=stats_routes(stats))
+
+        # TCP accept loop
+        threading.Thread(
+            target=run_server_request_async if args.mode == "async" else run_server_request,
+            args=(tcp_sock, args.max_sessions, counters, shoe_factory, metrics, timeouts, admission, stats,
+                  capture, seeds),
+            daemon=True
+        ).start()
 
-    # UDP broadcaster
-    run_server_offer(name, tcp_port)
+    # UDP broadcaster, only the parent advertises the shared port
+    run_server_offer(name, tcp_port, counters if args.advertise_load else None,
+                     args.max_sessions * args.workers,
+                     FEATURE_BINARY_DECISIONS if args.advertise_features else None)
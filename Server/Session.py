@@ -0,0 +1,152 @@
+from GameLogic.Game import Game
+from GameLogic.Table import Table
+from Protocol.Messages import DEALER_SEAT
+
+# protocol / payload constants
+ROUND_NOT_OVER = 0x0
+RESULT_TIE = 0x1
+RESULT_LOSS = 0x2
+RESULT_WIN = 0x3
+
+
+def game_result_to_code(result):
+    if result == "win":
+        return RESULT_WIN
+    if result == "loss":
+        return RESULT_LOSS
+    if result == "tie":
+        return RESULT_TIE
+    return ROUND_NOT_OVER
+
+
+class Session:
+    """
+    Round state machine for one connected player.
+    It never touches a socket: every step returns the (card, result) pairs
+    that have to be sent, so the threaded and the asyncio servers share it.
+    """
+
+    # hands played per round
+    seats = 1
+
+    def __init__(self, rounds, shoe=None):
+        self.rounds = rounds
+        self.shoe = shoe
+        self.rounds_played = 0
+        self.game = None
+        self.round_over = True
+        self.decisions = []  # this round's, "H" or "S" each
+
+    def start_round(self):
+        # one Game per session, reset between rounds instead of rebuilt
+        if self.game is None:
+            self.game = Game(self.shoe)
+        else:
+            self.game.reset()
+        self.game.start()
+        self.round_over = False
+        self.decisions = []
+
+        return [
+            (self.game.player_hand.cards[0], ROUND_NOT_OVER),
+            (self.game.player_hand.cards[1], ROUND_NOT_OVER),
+            (self.game.dealer_hand.cards[0], ROUND_NOT_OVER),
+        ]
+
+    def apply_decision(self, decision):
+        """Returns the cards to send for a decision, or None if it is invalid."""
+        if decision == "Hit":
+            self.decisions.append("H")
+            card = self.game.player_hit()
+
+            if self.game.player_hand.is_bust():
+                self._finish_round()
+                return [(card, RESULT_LOSS)]
+
+            return [(card, ROUND_NOT_OVER)]
+
+        if decision == "Stand":
+            self.decisions.append("S")
+            self.game.player_stand()
+            cards = [(card, ROUND_NOT_OVER) for card in self.game.dealer_hand.cards[1:-1]]
+
+            result_code = game_result_to_code(self.game.result())
+            cards.append((self.game.dealer_hand.cards[-1], result_code))
+
+            self._finish_round()
+            return cards
+
+        return None
+
+    def phase(self, decision):
+        """Name of the turn a decision starts, for the latency metrics."""
+        return "hit" if decision == "Hit" else "stand"
+
+    def round_record(self):
+        """(seat, player cards, dealer cards, decisions, result) of every hand of the finished round."""
+        game = self.game
+        return [(0, game.player_hand.cards, game.dealer_hand.cards, "".join(self.decisions), game.result())]
+
+    def _finish_round(self):
+        self.round_over = True
+        self.rounds_played += 1
+
+
+class BulkSession(Session):
+    """
+    Round state machine for one connection playing several seats at one
+    table. Steps return (seat, card, result) entries; seat DEALER_SEAT is the
+    dealer and a None card carries only a seat's result. A decision is a
+    bitmask over the seats still waiting: bit set = hit, clear = stand.
+    """
+
+    def __init__(self, rounds, seats, shoe=None):
+        super().__init__(rounds, shoe)
+        self.seats = seats
+        self.table = None
+        self.decisions = [[] for _ in range(seats)]
+
+    def start_round(self):
+        if self.table is None:
+            self.table = Table(self.seats, self.shoe)
+        else:
+            self.table.reset()
+        self.table.start()
+        self.round_over = False
+        self.decisions = [[] for _ in range(self.seats)]
+
+        entries = [(seat, hand.cards[0], ROUND_NOT_OVER) for seat, hand in enumerate(self.table.hands)]
+        entries += [(seat, hand.cards[1], ROUND_NOT_OVER) for seat, hand in enumerate(self.table.hands)]
+        entries.append((DEALER_SEAT, self.table.dealer_hand.cards[0], ROUND_NOT_OVER))
+        return entries
+
+    def apply_decision(self, hit_mask):
+        table = self.table
+        entries = []
+        for seat in table.waiting_seats():
+            if hit_mask >> seat & 1:
+                self.decisions[seat].append("H")
+                card = table.hit(seat)
+                entries.append((seat, card, RESULT_LOSS if table.hands[seat].is_bust() else ROUND_NOT_OVER))
+            else:
+                self.decisions[seat].append("S")
+                table.stand(seat)
+
+        if table.all_done():
+            table.play_dealer()
+            if not all(hand.is_bust() for hand in table.hands):
+                entries += [(DEALER_SEAT, card, ROUND_NOT_OVER) for card in table.dealer_hand.cards[1:]]
+                # bust seats already got their result with the card that bust them
+                entries += [(seat, None, game_result_to_code(table.result(seat)))
+                            for seat, hand in enumerate(table.hands) if not hand.is_bust()]
+            self._finish_round()
+
+        return entries
+
+    def phase(self, decision):
+        return "turn"
+
+    def round_record(self):
+        table = self.table
+        return [(seat, hand.cards, table.dealer_hand.cards, "".join(self.decisions[seat]), table.result(seat))
+                for seat, hand in enumerate(table.hands)]
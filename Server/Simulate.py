@@ -0,0 +1,87 @@
+"""
+Runs large blackjack simulations split across all cores.
+
+Every worker process gets its own independent random stream spawned from one
+numpy SeedSequence, so a run is reproducible from --seed (for a given number
+of workers). Worker results are merged and reported with 95% confidence
+intervals.
+
+    python Simulate.py --rounds 10000000 --policy basic --seed 42
+    python Simulate.py --rounds 2000000 --scaling
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from GameLogic.Simulation import POLICIES, simulate, simulate_scalar, summarize
+
+Z_95 = 1.96
+
+
+def run_chunk(engine, policy_name, rounds, seed_sequence):
+    policy = POLICIES[policy_name]()
+    if engine == "numpy":
+        report = simulate(rounds, policy, np.random.default_rng(seed_sequence))
+    else:
+        report = simulate_scalar(rounds, policy, random.Random(int(seed_sequence.generate_state(1)[0])))
+    return report["wins"], report["ties"], report["losses"]
+
+
+def run_parallel(engine, policy_name, rounds, workers, seed=None):
+    """Plays rounds split evenly over workers processes and returns the merged report."""
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    chunks = [rounds // workers + (1 if i < rounds % workers else 0) for i in range(workers)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_chunk, [engine] * workers, [policy_name] * workers, chunks, streams))
+
+    wins, ties, losses = (sum(column) for column in zip(*results))
+    return summarize(wins, ties, losses)
+
+
+def confidence_interval(report, field):
+    """95% half-width for a rate, or for the EV (outcomes of -1, 0 or +1)."""
+    rounds = report["rounds"]
+    if field == "ev":
+        variance = (report["wins"] + report["losses"]) / rounds - report["ev"] ** 2
+    else:
+        variance = report[field] * (1 - report[field])
+    return Z_95 * math.sqrt(variance / rounds)
+
+
+def print_report(report, elapsed, workers):
+    print(f"{report['rounds']} rounds on {workers} workers in {elapsed:.2f}s ({report['rounds'] / elapsed:,.0f} rounds/s)")
+    for field in ("win_rate", "tie_rate", "loss_rate", "ev"):
+        print(f"  {field:>9}: {report[field]:+.5f} +/- {confidence_interval(report, field):.5f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multiprocess blackjack simulation")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="basic")
+    parser.add_argument("--engine", choices=["numpy", "scalar"], default="numpy",
+                        help="vectorized engine, or the object based Game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, help="root seed, the worker streams are spawned from it")
+    parser.add_argument("--scaling", action="store_true",
+                        help="run with 1, 2, 4 .. --workers processes and report the throughput of each")
+    args = parser.parse_args()
+
+    if not args.scaling:
+        start = time.perf_counter()
+        report = run_parallel(args.engine, args.policy, args.rounds, args.workers, args.seed)
+        print_report(report, time.perf_counter() - start, args.workers)
+    else:
+        counts = sorted({min(2 ** i, args.workers) for i in range(args.workers.bit_length() + 1)})
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            run_parallel(args.engine, args.policy, args.rounds, workers, args.seed)
+            throughput = args.rounds / (time.perf_counter() - start)
+            baseline = baseline or throughput
+            print(f"{workers:>3} workers: {throughput:>12,.0f} rounds/s  (x{throughput / baseline:.2f})")
@@ -0,0 +1,183 @@
+"""
+Persistent per-round statistics.
+
+Sessions hand finished rounds to record(), which only puts them on a bounded
+queue and never waits: when the queue is full the round is dropped and
+counted instead. One writer thread owns the SQLite connection, inserts
+whatever has piled up in a single transaction, and folds the new rows into
+the in-memory leaderboard that queries are served from.
+"""
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+
+from Log import get_logger
+
+log = get_logger("stats")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    seat INTEGER NOT NULL,
+    player_cards TEXT NOT NULL,
+    dealer_cards TEXT NOT NULL,
+    decisions TEXT NOT NULL,   -- one letter per decision, H or S
+    result TEXT NOT NULL,      -- win, loss or tie
+    started REAL NOT NULL,     -- unix time the round was dealt
+    duration_ms REAL NOT NULL, -- deal to result, player think time included
+    server_us INTEGER NOT NULL -- time the server spent on the round
+)
+"""
+INSERT = "INSERT INTO rounds (player, seat, player_cards, dealer_cards, decisions, result, started, " \
+         "duration_ms, server_us) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+# the rows committed since the last refresh, by any process writing to the file
+NEW_RESULTS = "SELECT player, result, COUNT(*), MAX(id) FROM rounds WHERE id > ? GROUP BY player, result"
+
+RANKS = (None, "A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+SUITS = "HDCS"
+RESULTS = ("win", "loss", "tie")
+
+_STOP = object()
+
+
+def cards_code(cards):
+    """Compact text form of a hand, e.g. "AH 10S"."""
+    return " ".join(RANKS[card.rank] + SUITS[card.shape] for card in cards)
+
+
+class StatsStore:
+    """
+    SQLite store of every finished round, in WAL mode so readers and the
+    writers of other worker processes do not block each other.
+    """
+
+    def __init__(self, path, queue_size=10000, batch_size=500, refresh_interval=1.0):
+        self.path = path
+        self.queue = queue.Queue(queue_size)
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.dropped = 0
+
+        # player -> [rounds, wins, losses, ties]
+        self.players = {}
+        self.last_id = 0
+        self.lock = threading.Lock()
+        self._board = None  # sorted leaderboard, rebuilt after the counts change
+
+        self.thread = None
+
+    def start(self):
+        conn = self._connect()
+        self._refresh(conn)  # rounds of earlier runs count too
+        self.thread = threading.Thread(target=self._write_loop, args=(conn,), name="stats-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+        return self
+
+    def close(self):
+        """Writes out what is still queued and stops the writer."""
+        if self.thread is None:
+            return
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.thread = None
+
+    def record_round(self, player, session, started, duration, server_time):
+        """Queues the hands of session's finished round; returns False if they had to be dropped."""
+        rows = [(player, seat, cards_code(cards), cards_code(dealer_cards), decisions, result,
+                 started, duration * 1000, int(server_time * 1_000_000))
+                for seat, cards, dealer_cards, decisions, result in session.round_record()]
+        try:
+            self.queue.put_nowait(rows)
+        except queue.Full:
+            self.dropped += len(rows)
+            return False
+        return True
+
+    def leaderboard(self, limit=10, min_rounds=1):
+        """Players by win rate, as (player, win rate, rounds, wins, losses, ties)."""
+        with self.lock:
+            if self._board is None:
+                self._board = sorted(
+                    ((player, wins / rounds, rounds, wins, losses, ties)
+                     for player, (rounds, wins, losses, ties) in self.players.items()),
+                    key=lambda row: (-row[1], -row[2], row[0]))
+            board = self._board
+        return [row for row in board if row[2] >= min_rounds][:limit]
+
+    def player(self, name):
+        """(rounds, wins, losses, ties) of one player, or None if they never finished a round."""
+        with self.lock:
+            counts = self.players.get(name)
+            return None if counts is None else tuple(counts)
+
+    def leaderboard_page(self):
+        """The leaderboard as an HTTP (content type, body) pair."""
+        rows = [{"player": player, "win_rate": round(rate, 4), "rounds": rounds,
+                 "wins": wins, "losses": losses, "ties": ties}
+                for player, rate, rounds, wins, losses, ties in self.leaderboard(limit=100)]
+        return "application/json", json.dumps(rows)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # with WAL, NORMAL only syncs at checkpoints; a crash can lose the last commits, not the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SCHEMA)
+        conn.commit()
+        return conn
+
+    def _write_loop(self, conn):
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=self.refresh_interval)
+            except queue.Empty:
+                # idle: still pick up what the other workers wrote
+                self._refresh(conn)
+                continue
+            if item is _STOP:
+                break
+
+            # one transaction for everything that queued up meanwhile
+            rows = item
+            while len(rows) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                rows += item
+
+            try:
+                with conn:
+                    conn.executemany(INSERT, rows)
+            except sqlite3.Error as e:
+                log.error("stats write failed rows=%d error=%s", len(rows), e)
+            self._refresh(conn)
+
+        conn.close()
+
+    def _refresh(self, conn):
+        """Adds the rows written since the last refresh to the cached counts."""
+        try:
+            new = conn.execute(NEW_RESULTS, (self.last_id,)).fetchall()
+        except sqlite3.Error as e:
+            log.error("stats refresh failed error=%s", e)
+            return
+        if not new:
+            return
+
+        with self.lock:
+            for player, result, count, last_id in new:
+                counts = self.players.setdefault(player, [0, 0, 0, 0])
+                counts[0] += count
+                if result in RESULTS:
+                    counts[1 + RESULTS.index(result)] += count
+                self.last_id = max(self.last_id, last_id)
+            self._board = None
@@ -0,0 +1,62 @@
+import socket
+import time
+
+# why a session was evicted, also the phase it was waiting in
+HANDSHAKE = "handshake"  # connected but never sent a complete request
+DECISION = "decision"  # took too long to answer Hit/Stand
+WRITE = "write"  # stopped reading, the server's send could not complete
+SESSION = "session"  # ran past the total session time
+KEEPALIVE = "keepalive"  # the peer vanished, TCP keepalive probes went unanswered
+EVICTION_REASONS = (HANDSHAKE, DECISION, WRITE, SESSION, KEEPALIVE)
+
+
+class Timeouts:
+    """
+    Limits, in seconds, after which a session is evicted and its seat freed.
+    None disables a limit. The total session limit cuts every wait short, so
+    no phase can run past it.
+    """
+
+    def __init__(self, handshake=10.0, decision=120.0, session=3600.0,
+                 keepalive_idle=30, keepalive_interval=10, keepalive_count=3):
+        self.handshake = handshake
+        self.decision = decision
+        self.session = session
+        self.keepalive_idle = keepalive_idle
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_count = keepalive_count
+
+    def start(self):
+        """Returns the deadline of a session starting now (monotonic clock), or None."""
+        return None if self.session is None else time.monotonic() + self.session
+
+    def limit(self, phase, deadline):
+        """(timeout, eviction reason) for the next wait in phase."""
+        timeout = self.handshake if phase == HANDSHAKE else self.decision
+        if deadline is not None:
+            # a zero timeout would make the socket non-blocking instead of timing out
+            left = max(deadline - time.monotonic(), 0.001)
+            if timeout is None or left < timeout:
+                return left, SESSION
+        return timeout, phase
+
+    def apply(self, sock, phase, deadline):
+        """Sets the blocking socket's timeout for the next wait and returns the eviction reason."""
+        timeout, reason = self.limit(phase, deadline)
+        sock.settimeout(timeout)
+        return reason
+
+    def configure_socket(self, sock):
+        """Options for an accepted player socket."""
+        # every server turn is one complete write; do not hold it back waiting for the previous ACK
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        if not self.keepalive_idle:
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # the fine-grained knobs are Linux (and some BSD) only, elsewhere the system defaults apply
+        for option, value in (("TCP_KEEPIDLE", self.keepalive_idle),
+                              ("TCP_KEEPINTVL", self.keepalive_interval),
+                              ("TCP_KEEPCNT", self.keepalive_count)):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
@@ -0,0 +1,56 @@
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# same layout the scripts set up: the Protocol package from the root, the modules from Server/ and Client/
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "Server"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "Client"))
+
+from Protocol.Messages import MAGIC_COOKIE, MSG_TYPE_REQUEST, REQUEST_STRUCT, PAYLOAD_STRUCT
+
+
+@pytest.fixture
+def start_server():
+    """Starts run_server_request on a free local port in a daemon thread; returns the port."""
+    import Server
+
+    def start(**kwargs):
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_sock.bind(("127.0.0.1", 0))
+        # listening before the thread starts, so the test can connect right away
+        server_sock.listen()
+        threading.Thread(target=Server.run_server_request, args=(server_sock,), kwargs=kwargs, daemon=True).start()
+        return server_sock.getsockname()[1]
+
+    return start
+
+
+def recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("server closed the connection")
+        data += chunk
+    return data
+
+
+def play_text_session(port, name, rounds=1, timeout=5):
+    """Plays rounds standing on every hand; returns the round results."""
+    results = []
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        sock.sendall(REQUEST_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_REQUEST, rounds, name))
+        for _ in range(rounds):
+            for _ in range(3):
+                recv_exactly(sock, PAYLOAD_STRUCT.size)
+            sock.sendall(b"Stand")
+            result = 0
+            while result == 0:
+                _, _, result, _, _ = PAYLOAD_STRUCT.unpack(recv_exactly(sock, PAYLOAD_STRUCT.size))
+            results.append(result)
+    return results
@@ -0,0 +1,23 @@
+import multiprocessing
+
+from Counters import WorkerCounters, ROUNDS, SESSIONS
+
+
+def count_rounds(counters, index, rounds):
+    counters.worker = index
+    for _ in range(rounds):
+        counters.add(ROUNDS)
+
+
+def test_workers_count_into_their_own_rows():
+    counters = WorkerCounters(workers=3)
+    workers = [multiprocessing.Process(target=count_rounds, args=(counters, index, 1000 * (index + 1)))
+               for index in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [row[ROUNDS] for row in counters.snapshot()] == [1000, 2000, 3000]
+    assert counters.total(ROUNDS) == 6000
+    assert counters.totals()[SESSIONS] == 0
@@ -0,0 +1,77 @@
+import socket
+import struct
+import threading
+
+import pytest
+
+from Protocol.Messages import MAGIC_COOKIE, MSG_TYPE_OFFER, OFFER_STRUCT, FEATURE_BINARY_DECISIONS
+from Discovery import Discovery, ServerInfo
+from Server import answer_pings, generate_server_name, get_offer_msg
+
+
+def offer(load=None, features=FEATURE_BINARY_DECISIONS):
+    return get_offer_msg(5000, generate_server_name("test"), load, features)
+
+
+def test_default_offer_keeps_the_original_format():
+    default = get_offer_msg(5000, generate_server_name("test"))
+    # the original client receives 39 bytes and unpacks the whole datagram
+    assert len(default) == 39
+    assert struct.unpack('! I B H 32s', default)[2] == 5000
+
+
+def test_load_offer_is_read_by_discovery_and_not_by_the_legacy_parse():
+    loaded = offer((3, 8, 12), features=None)
+    server = ServerInfo("test", "127.0.0.1", 5000)
+    server.update(loaded)
+    assert (server.active, server.capacity, server.latency_ms) == (3, 8, 12)
+
+    # the original client unpacks the whole datagram with the 39-byte format
+    with pytest.raises(struct.error):
+        struct.unpack('! I B H 32s', loaded)
+    # where the datagram is cut to 39 bytes instead, the tail is ignored
+    assert struct.unpack('! I B H 32s', loaded[:39]) == struct.unpack('! I B H 32s', offer(features=None))
+
+
+def test_binary_decisions_only_when_advertised():
+    server = ServerInfo("test", "127.0.0.1", 5000)
+    assert server.use_text_decisions()
+
+    # an older server's offer, or one started without --advertise-features, carries no feature byte
+    server.update(offer(features=None))
+    assert server.use_text_decisions()
+
+    server.update(offer())
+    assert not server.use_text_decisions()
+    assert server.use_text_decisions("text")
+
+
+def test_load_and_features_in_one_offer():
+    server = ServerInfo("test", "127.0.0.1", 5000)
+    server.update(offer((3, 8, 12)))
+    assert (server.active, server.capacity, server.latency_ms) == (3, 8, 12)
+    assert server.binary_decisions
+
+    # load without features, as sent by servers before the feature byte
+    server = ServerInfo("test", "127.0.0.1", 5000)
+    server.update(offer((3, 8, 12), features=None))
+    assert server.capacity == 8
+    assert not server.binary_decisions
+
+
+def test_offer_with_invalid_utf8_name_is_kept():
+    discovery = Discovery(probe_rtt=False)
+    bad_name = OFFER_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_OFFER, 5000, b"\xff\xfe bad \xc3")
+    discovery._offer(bad_name, ("127.0.0.1", 40000))
+    discovery._offer(offer(), ("127.0.0.2", 40000))
+    assert len(discovery.servers()) == 2
+
+
+def test_probe_pings_the_offer_socket():
+    udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp_sock.bind(("127.0.0.1", 0))
+    threading.Thread(target=answer_pings, args=(udp_sock,), daemon=True).start()
+
+    server = ServerInfo("test", "127.0.0.1", 5000, udp_sock.getsockname())
+    Discovery(probe_rtt=False)._probe(server)
+    assert server.rtt is not None
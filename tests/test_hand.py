@@ -0,0 +1,42 @@
+from GameLogic.Card import Card
+from GameLogic.Hand import Hand
+
+
+def hand(*ranks):
+    result = Hand()
+    for rank in ranks:
+        result.add_card(Card(rank, 0))
+    return result
+
+
+def test_two_aces_are_soft_12():
+    aces = hand(1, 1)
+    assert aces.total() == 12
+    assert aces.is_soft()
+    assert not aces.is_bust()
+
+
+def test_ace_six_is_soft_17():
+    soft = hand(1, 6)
+    assert soft.total() == 17
+    assert soft.is_soft()
+
+
+def test_ace_six_ten_is_hard_17():
+    hard = hand(1, 6, 10)
+    assert hard.total() == 17
+    assert not hard.is_soft()
+    assert not hard.is_bust()
+
+
+def test_ace_on_hard_11_counts_as_one():
+    eleven = hand(5, 6, 1)
+    assert eleven.total() == 12
+    assert not eleven.is_soft()
+
+
+def test_clear_resets_the_totals():
+    cleared = hand(1, 10)
+    cleared.clear()
+    assert cleared.total() == 0
+    assert not cleared.is_soft()
@@ -0,0 +1,11 @@
+from Client import generate_client_name
+from Server import generate_server_name
+
+# 31 ASCII bytes and a 2-byte character: a plain 32-byte cut splits the character
+LONG_NAME = "a" * 31 + "é"
+
+
+def test_names_are_cut_on_a_character_boundary():
+    for packed in (generate_client_name(LONG_NAME), generate_server_name(LONG_NAME)):
+        assert len(packed) == 32
+        assert packed.rstrip(b"\x00").decode("utf-8") == "a" * 31
@@ -0,0 +1,58 @@
+import socket
+
+from Protocol.Messages import MAGIC_COOKIE, MSG_TYPE_REQUEST, REQUEST_STRUCT, PAYLOAD_STRUCT
+from Admission import Admission, AdmissionQueue
+from GameLogic.Shoe import Shoe
+from Metrics import ServerMetrics
+from Timeouts import Timeouts, DECISION
+
+from conftest import play_text_session, recv_exactly
+
+
+def test_invalid_utf8_name_does_not_cost_a_seat(start_server):
+    port = start_server(max_sessions=1, admission=Admission(max_wait=2))
+
+    assert len(play_text_session(port, b"\xff\xfe bad \xc3")) == 1
+    # the only seat is still there for the next player
+    assert len(play_text_session(port, b"good", rounds=2)) == 2
+
+
+def test_seat_survives_a_crashing_session(start_server):
+    calls = []
+
+    def shoe_factory(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return Shoe(**kwargs)
+
+    port = start_server(max_sessions=1, shoe_factory=shoe_factory, admission=Admission(max_wait=2))
+
+    try:
+        play_text_session(port, b"first")
+    except ConnectionError:
+        pass
+    assert len(play_text_session(port, b"second")) == 1
+
+
+def test_admission_queue_without_wait_limit_never_expires():
+    waiting = AdmissionQueue(backlog=2, max_wait=None)
+    assert waiting.offer("player")
+    assert waiting.expire() == []
+    assert waiting.take()[0] == "player"
+
+
+def test_decision_timeout_evicts_and_frees_the_seat(start_server):
+    metrics = ServerMetrics()
+    port = start_server(max_sessions=1, metrics=metrics, timeouts=Timeouts(decision=0.2),
+                        admission=Admission(max_wait=5))
+
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(REQUEST_STRUCT.pack(MAGIC_COOKIE, MSG_TYPE_REQUEST, 1, b"idle"))
+        for _ in range(3):
+            recv_exactly(sock, PAYLOAD_STRUCT.size)
+        # never decides; the server closes the connection
+        assert sock.recv(1) == b""
+
+    assert metrics.evictions.labels(DECISION).value == 1
+    assert len(play_text_session(port, b"next")) == 1
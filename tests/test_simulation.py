@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from GameLogic import Simulation
+from GameLogic.Simulation import POLICIES, cross_check, simulate, simulate_scalar
+
+
+@pytest.mark.parametrize("policy_name", ["basic", "stand"])
+def test_vectorized_engine_matches_game(policy_name):
+    policy = POLICIES[policy_name]()
+    vector = simulate(200_000, policy, np.random.default_rng(1))
+    scalar = simulate_scalar(20_000, policy, random.Random(1))
+    # both runs are seeded, so this is deterministic; a real rule mismatch shows up far above 4
+    assert cross_check(vector, scalar) < 4
+
+
+def test_batch_memory_does_not_grow_with_decks(monkeypatch):
+    sizes = []
+    play_batch = Simulation.play_batch
+
+    def recording(size, policy, rng, decks=1):
+        sizes.append(size * 52 * decks)
+        return play_batch(size, policy, rng, decks)
+
+    monkeypatch.setattr(Simulation, "play_batch", recording)
+    report = simulate(300_000, POLICIES["basic"](), np.random.default_rng(1), decks=8)
+    assert report["rounds"] == 300_000
+    assert max(sizes) <= Simulation.MAX_BATCH_CARDS
@@ -0,0 +1,40 @@
+import math
+import os
+
+import pytest
+
+from Strategy import build_table, cache_path, load_or_build
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_table()
+
+
+def test_every_reachable_situation_has_finite_evs(table):
+    for upcard in range(1, 11):
+        for total in range(4, 22):
+            for soft in (False, True) if total >= 12 else (False,):
+                assert all(math.isfinite(ev) for ev in table.lookup(total, soft, upcard))
+
+
+@pytest.mark.parametrize("total, soft, upcard", [(11, True, 5), (3, False, 5), (22, False, 5), (12, False, 0)])
+def test_unreachable_situations_raise(table, total, soft, upcard):
+    with pytest.raises(ValueError):
+        table.lookup(total, soft, upcard)
+
+
+def test_damaged_cache_is_rebuilt(table, tmp_path):
+    path = cache_path(None, str(tmp_path))
+    table.save(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    # a build interrupted halfway
+    with open(path, "wb") as f:
+        f.write(data[:len(data) // 2])
+
+    rebuilt = load_or_build(None, str(tmp_path))
+    assert rebuilt.lookup(16, False, 10) == pytest.approx(table.lookup(16, False, 10))
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert os.listdir(str(tmp_path)) == [os.path.basename(path)]
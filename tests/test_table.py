@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from Protocol.Messages import MAX_SEATS
+from GameLogic.Shoe import Shoe
+from GameLogic.Table import CARDS_PER_HAND, max_seats
+from Session import BulkSession
+
+
+class PhysicalCard:
+    """A distinct object per card in the shoe, so the same physical card dealt twice can be told apart."""
+
+    __slots__ = ("rank", "shape", "points", "hard_points")
+
+    def __init__(self, card):
+        self.rank = card.rank
+        self.shape = card.shape
+        self.points = card.points
+        self.hard_points = card.hard_points
+
+
+def play_rounds(decks, penetration, seats, rounds, seed):
+    """Seats hit or stand at random, so rounds start all over the shoe; yields each round's dealt cards."""
+    rng = random.Random(seed)
+    shoe = Shoe(decks, penetration, rng=rng)
+    shoe.cards = [PhysicalCard(card) for card in shoe.cards]
+    session = BulkSession(rounds, seats, shoe)
+    for _ in range(rounds):
+        session.start_round()
+        while not session.round_over:
+            session.apply_decision(rng.getrandbits(seats))
+        table = session.table
+        yield [card for hand in table.hands + [table.dealer_hand] for card in hand.cards]
+
+
+@pytest.mark.parametrize("decks, seats", [(6, MAX_SEATS), (2, max_seats(2 * 52)), (1, max_seats(52))])
+@pytest.mark.parametrize("penetration", [0.75, 1.0])
+def test_no_card_dealt_twice_in_a_round(decks, penetration, seats):
+    for dealt in play_rounds(decks, penetration, seats, rounds=200, seed=decks):
+        assert len(set(map(id, dealt))) == len(dealt)
+
+
+def test_table_refuses_more_seats_than_the_shoe_can_deal():
+    with pytest.raises(ValueError):
+        BulkSession(1, max_seats(52) + 1, Shoe(1)).start_round()
+
+
+@pytest.mark.parametrize("decks", [1, 2])
+def test_max_seats_never_run_the_shoe_dry(decks):
+    seats = max_seats(52 * decks)
+    reserve = CARDS_PER_HAND * (seats + 1)
+    # rounds starting anywhere the reserve allows, on the smallest cards first,
+    # so every seat that keeps hitting takes as many cards as it can
+    for skipped in range(52 * decks - reserve + 1):
+        shoe = Shoe(decks, 1.0, rng=random.Random(skipped))
+        shoe.cards[skipped:] = sorted(shoe.cards[skipped:], key=lambda card: card.hard_points)
+        shoe.position = skipped
+        session = BulkSession(1, seats, shoe)
+        session.start_round()
+        while not session.round_over:
+            session.apply_decision((1 << seats) - 1)